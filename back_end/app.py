@@ -1,5 +1,6 @@
 import sys
 import logging
+from datetime import datetime
 import firebase_admin
 from firebase_admin import credentials
 from config import Config
@@ -8,6 +9,7 @@ from flask_cors import CORS
 from mongoengine import connect
 from utils import CachedShop, ZeroReviewShop, cache
 from routes import auth_bp, product_bp, profile_bp
+from services import start_warm_up, readiness
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from waitress import serve
@@ -56,9 +58,14 @@ app.register_blueprint(auth_bp)
 app.register_blueprint(product_bp)
 app.register_blueprint(profile_bp)
 
+# Spawned inference workers import this file again as __mp_main__;
+# only the server process runs the scheduler and the warm-up
+IS_SERVER_PROCESS = __name__ != "__mp_main__"
+
 # Background Scheduler Setup
 scheduler = BackgroundScheduler()
-scheduler.start()
+if IS_SERVER_PROCESS:
+    scheduler.start()
 
 def cleanup_invalid_data():
     try:
@@ -68,22 +75,30 @@ def cleanup_invalid_data():
     except Exception as e:
         logger.exception("Error during cleanup job")
 
-# Schedule cleanup every 24 hours
+# Schedule cleanup every 24 hours, first run right away (in the background)
 scheduler.add_job(
     func=cleanup_invalid_data,
     trigger=IntervalTrigger(hours=24),
     id='cleanup_invalid_data',
     name='Clean up invalid cached and zero review shops data',
+    next_run_time=datetime.now(),
     replace_existing=True
 )
 
-# Run cleanup immediately on startup
-cleanup_invalid_data()
+# Load models in the background; /ready reports when they are in
+if Config.WARM_UP_ON_START and IS_SERVER_PROCESS:
+    start_warm_up()
 
 @app.route("/")
 def home():
     return "Flask backend is running."
 
+# Readiness probe: 200 once models are loaded, 503 until then
+@app.route("/ready")
+def ready():
+    state = readiness()
+    return state, 200 if state["ready"] else 503
+
 # Log every request
 @app.before_request
 def log_request():
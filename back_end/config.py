@@ -13,3 +13,91 @@ class Config:
     BREVO_API_KEY = os.getenv("BREVO_API_KEY")
     EMAIL_FROM = os.getenv("EMAIL_FROM")
     GPT_API_KEY = os.getenv("GPT_API_KEY")
+
+    # Google Places HTTP pool
+    PLACES_MAX_CONNECTIONS = int(os.getenv("PLACES_MAX_CONNECTIONS", 20))
+    PLACES_MAX_KEEPALIVE = int(os.getenv("PLACES_MAX_KEEPALIVE", 10))
+    PLACE_DETAILS_CONCURRENCY = int(os.getenv("PLACE_DETAILS_CONCURRENCY", 8))
+
+    # Cache-first candidate search: use cached shops when at least this many
+    # fresh ones match the product inside the radius, else ask Google
+    LOCAL_MIN_CANDIDATES = int(os.getenv("LOCAL_MIN_CANDIDATES", 10))
+    LOCAL_MAX_AGE_DAYS = int(os.getenv("LOCAL_MAX_AGE_DAYS", 3))
+
+    # Shared search-result cache, keyed by geohash tile + radius bucket
+    SEARCH_CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", "search_cache")
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 2000))
+    SEARCH_CACHE_GEOHASH_PRECISION = int(os.getenv("SEARCH_CACHE_GEOHASH_PRECISION", 7))
+    SEARCH_CACHE_RADIUS_STEP_M = int(os.getenv("SEARCH_CACHE_RADIUS_STEP_M", 500))
+
+    # Search fan-out: candidates scraped at once per search (scoring jobs
+    # running at once across searches: INFERENCE_CONCURRENCY below)
+    SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", 4))
+    SCRAPE_TIMEOUT_S = int(os.getenv("SCRAPE_TIMEOUT_S", 90))
+
+    # Background search jobs: searches run at once per process, and how long
+    # a job (and its result) is kept for polling
+    SEARCH_JOB_WORKERS = int(os.getenv("SEARCH_JOB_WORKERS", 2))
+    SEARCH_JOB_TTL_S = int(os.getenv("SEARCH_JOB_TTL_S", 3600))
+
+    # "bulk" = one page.evaluate per scroll, "element" = per-card round trips
+    SCRAPER_EXTRACT_MODE = os.getenv("SCRAPER_EXTRACT_MODE", "bulk")
+
+    # Playwright browser pool
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+    BROWSER_MAX_TABS = int(os.getenv("BROWSER_MAX_TABS", 3))
+    BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", 50))
+    BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", 1500))
+
+    # LLM (summaries / explanations): "openai" or "stub" (offline, deterministic)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 8))
+    LLM_STUB_LATENCY_S = float(os.getenv("LLM_STUB_LATENCY_S", 0))
+
+    # Startup: NLTK data is read from a local bundle (see utils/nltk_data.py)
+    # and only downloaded when allowed; models load on first use or warm-up
+    NLTK_DATA_DIR = os.path.abspath(os.getenv("NLTK_DATA_DIR", "nltk_data"))
+    NLTK_ALLOW_DOWNLOAD = os.getenv("NLTK_ALLOW_DOWNLOAD", "false").lower() == "true"
+    WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "true").lower() == "true"
+
+    # Inference
+    # DistilBERT backend per model: "torch" (fp32), "int8" (dynamic
+    # quantization) or "onnx" (ONNX Runtime, exported into ONNX_DIR)
+    RATING_MODEL_BACKEND = os.getenv("RATING_MODEL_BACKEND", "torch")
+    DETECTOR_MODEL_BACKEND = os.getenv("DETECTOR_MODEL_BACKEND", "torch")
+    ONNX_DIR = os.getenv("ONNX_DIR", "onnx_models")
+    # ONNX Runtime intra-op threads per model. torch's thread pool is
+    # process-wide, so torch/int8 models share TORCH_THREADS instead
+    RATING_MODEL_THREADS = int(os.getenv("RATING_MODEL_THREADS", 2))
+    DETECTOR_MODEL_THREADS = int(os.getenv("DETECTOR_MODEL_THREADS", 1))
+    TORCH_THREADS = int(os.getenv("TORCH_THREADS", 2))
+    # DistilBERT worker processes (0 = run inline in the server process);
+    # concurrent requests are merged into batches for up to the window
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+    INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", 10))
+    INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 64))
+    INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", 60))
+    # model/GPT scoring jobs running at once across all searches. This also
+    # caps what the micro-batcher can merge, so it is higher with workers
+    INFERENCE_CONCURRENCY = int(os.getenv("INFERENCE_CONCURRENCY", 8 if INFERENCE_WORKERS > 0 else 2))
+    INFERENCE_BATCH_SIZE = int(os.getenv("INFERENCE_BATCH_SIZE", 16))
+    # prefix of review_service.model_version(), which adds a hash of the model files
+    MODEL_VERSION = os.getenv("MODEL_VERSION", "xgb_hybrid_final")
+    FEATURE_STORE_ENABLED = os.getenv("FEATURE_STORE_ENABLED", "true").lower() == "true"
+    FEATURE_STORE_DIR = os.getenv("FEATURE_STORE_DIR", "feature_store")
+    # rows of DistilBERT outputs kept (773 float32 ≈ 3 KB each) before the
+    # store starts over
+    FEATURE_STORE_MAX_ROWS = int(os.getenv("FEATURE_STORE_MAX_ROWS", 200000))
+    # compute only the TF-IDF terms / meta features the booster splits on
+    # (checked bit-identical against the full path at load, else disabled)
+    FEATURE_PRUNING = os.getenv("FEATURE_PRUNING", "true").lower() == "true"
+
+    # Explanations
+    # "xgboost" (native pred_contribs) or "shap" (shap.TreeExplainer)
+    SHAP_BACKEND = os.getenv("SHAP_BACKEND", "xgboost")
+    LIME_NUM_SAMPLES = int(os.getenv("LIME_NUM_SAMPLES", 150))
+    LIME_BATCH_SIZE = int(os.getenv("LIME_BATCH_SIZE", 64))
+    # seconds left in the request below which LIME is skipped
+    LIME_MIN_BUDGET_S = float(os.getenv("LIME_MIN_BUDGET_S", 5))
+    # total seconds allowed for predict + explain, 0 = unbounded
+    EXPLANATION_LATENCY_BUDGET_S = float(os.getenv("EXPLANATION_LATENCY_BUDGET_S", 0))
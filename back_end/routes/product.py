@@ -1,34 +1,51 @@
 import json
 import time
+import uuid
 import logging
 import asyncio
-import nest_asyncio
 import threading
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from concurrent.futures import TimeoutError as ConcurrentTimeoutError
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, after_this_request, current_app
 
+from config import Config
 from utils import (
     cache,
     CachedShop,
+    CachedReview,
     ZeroReviewShop,
+    SearchJob,
+    loop,
+    WriteBuffer,
+    compile_opening_hours,
+    normalize_product,
+    calculate_distances,
+    geohash_encode,
+    geohash_center,
+    geohash_half_diagonal_m,
+    radius_bucket,
 )
 from services import (
-    fetch_and_filter_shops_with_text,
-    predict_review_rating_with_explanations,
-    generate_summary,
+    find_shops_cache_first,
+    score_reviews,
+    describe_reviews,
+    model_version,
     fetch_real_reviews,
-    fetch_place_details
+    get_place_details_many
 )
 
 product_bp = Blueprint('product', __name__, url_prefix='/product')
 logger = logging.getLogger(__name__)
 
-# AsyncIO setup
-nest_asyncio.apply()
-loop = asyncio.new_event_loop()
-asyncio.set_event_loop(loop)
-threading.Thread(target=lambda: loop.run_forever(), daemon=True).start()
+# Model scoring is shared by every search (GPT calls are limited in llm_service);
+# with inference workers this bounds how many searches one micro-batch can merge
+inference_slots = threading.BoundedSemaphore(Config.INFERENCE_CONCURRENCY)
+
+# Queued searches run here, off the Waitress request threads
+search_job_pool = ThreadPoolExecutor(
+    max_workers=Config.SEARCH_JOB_WORKERS, thread_name_prefix="search-job"
+)
 
 
 def apply_bayesian_rating(avg_pred, review_count, global_avg, m=3):
@@ -46,44 +63,117 @@ def safe_jsonify(data):
         return jsonify({"error": "Serialization failed", "details": str(e)}), 500
 
 
-def process_live_shop(place, review_count):
+def stopped(cancelled):
+    # the search already has enough shops
+    return cancelled is not None and cancelled.is_set()
+
+
+def wait_for_scrape(future, cancelled):
+    # Poll so a search that already has enough shops can cancel this scrape
+    deadline = time.monotonic() + Config.SCRAPE_TIMEOUT_S
+    while True:
+        if stopped(cancelled):
+            future.cancel()
+            return None
+        try:
+            return future.result(timeout=min(1, max(0, deadline - time.monotonic())))
+        except ConcurrentTimeoutError:
+            if time.monotonic() >= deadline:
+                future.cancel()
+                raise
+
+
+def mark_zero_review(writes, place_id):
+    writes.upsert(ZeroReviewShop, {"place_id": place_id}, {"$set": {"added_at": datetime.utcnow()}})
+
+
+def live_shop_fields(place):
+    lat = float(place["geometry"]["location"]["lat"])
+    lng = float(place["geometry"]["location"]["lng"])
+    return {
+        "name": place["name"],
+        "rating": float(place.get("rating", 0)),
+        "address": place.get("formatted_address", "N/A"),
+        "lat": lat,
+        "lng": lng,
+        "location": {"type": "Point", "coordinates": [lng, lat]},
+        "cached_at": datetime.utcnow(),
+    }
+
+
+def keep_scraped_reviews(place, reviews, product_key, writes):
+    # The search no longer needs this shop: cache its reviews unscored, so the
+    # next search scores them (rescore_cached_shop) instead of scraping again
+    place_id = place["place_id"]
+    writes.replace_many(
+        CachedReview, {"place_id": place_id},
+        CachedReview.documents_for_shop(place_id, reviews, [None] * len(reviews), [[]] * len(reviews))
+    )
+    writes.upsert(CachedShop, {"place_id": place_id}, {
+        "$set": live_shop_fields(place),
+        "$addToSet": {"products": product_key},
+        # earlier predictions were made for other reviews
+        "$unset": {"reviews": "", "review_ratings": "", "summary": "",
+                   "xai_explanation": "", "model_version": ""},
+    })
+
+
+def process_live_shop(place, review_count, product_key, writes, cancelled=None):
     place_id = place["place_id"]
     future = asyncio.run_coroutine_threadsafe(
         fetch_real_reviews(place_id, max_reviews=review_count), loop
     )
     try:
-        reviews = future.result(timeout=90)
+        reviews = wait_for_scrape(future, cancelled)
     except Exception:
-        ZeroReviewShop.objects(place_id=place_id)\
-                      .update_one(set__added_at=datetime.utcnow(), upsert=True)
+        mark_zero_review(writes, place_id)
+        return None
+    if reviews is None and stopped(cancelled):
         return None
 
     if not reviews:
-        ZeroReviewShop.objects(place_id=place_id)\
-                      .update_one(set__added_at=datetime.utcnow(), upsert=True)
+        mark_zero_review(writes, place_id)
         return None
 
+    reviews = [r for r in reviews if r.get("text")]
     reviews.sort(key=lambda r: r["date"], reverse=True)
-    texts = [r["text"] for r in reviews if r.get("text")]
+    texts = [r["text"] for r in reviews]
     if not texts:
-        ZeroReviewShop.objects(place_id=place_id)\
-                      .update_one(set__added_at=datetime.utcnow(), upsert=True)
+        mark_zero_review(writes, place_id)
         return None
 
-    xai = predict_review_rating_with_explanations(texts)
+    # a straggler the search will throw away skips the models and GPT
+    with inference_slots:
+        if stopped(cancelled):
+            keep_scraped_reviews(place, reviews, product_key, writes)
+            return None
+        scored = score_reviews(texts)
+    if stopped(cancelled):
+        keep_scraped_reviews(place, reviews, product_key, writes)
+        return None
+    xai = describe_reviews(texts, scored)
+    summary = xai["summary"]
     avg_pred = round(sum(xai["ratings"]) / len(texts), 2)
 
-    # cache full payload
-    CachedShop.objects(place_id=place_id).update_one(
-        set__name=place["name"],
-        set__rating=float(place.get("rating", 0)),
-        set__reviews=reviews,
-        set__address=place.get("formatted_address", "N/A"),
-        set__lat=float(place["geometry"]["location"]["lat"]),
-        set__lng=float(place["geometry"]["location"]["lng"]),
-        set__cached_at=datetime.utcnow(),
-        upsert=True
-    )
+    # cache full payload, model output included (only if scoring and GPT succeeded)
+    shop_set = live_shop_fields(place)
+    shop_update = {"$set": shop_set, "$addToSet": {"products": product_key}}
+    if xai["ok"]:
+        writes.replace_many(
+            CachedReview, {"place_id": place_id},
+            CachedReview.documents_for_shop(place_id, reviews, xai["ratings"], xai["probs"])
+        )
+        shop_set.update({
+            "review_ratings": xai["ratings"],
+            "summary": summary,
+            "xai_explanation": xai["user_friendly_explanation"],
+            "model_version": model_version(),
+        })
+        # texts now live in CachedReview: drop a legacy embedded copy
+        shop_update["$unset"] = {"reviews": ""}
+    else:
+        logger.warning(f"[{place_id}] Scoring or GPT failed, result not cached")
+    writes.upsert(CachedShop, {"place_id": place_id}, shop_update)
 
     return {
         "name":        place["name"],
@@ -94,31 +184,183 @@ def process_live_shop(place, review_count):
         "lng":         place["geometry"]["location"]["lng"],
         "review_count": len(texts),
         "predicted_rating": avg_pred,
-        "summary":     generate_summary(texts),
+        "summary":     summary,
         "xai_explanations": xai["user_friendly_explanation"],
     }
 
 
-@product_bp.route("/search_product", methods=["POST", "OPTIONS"])
-def search_product():
-    if request.method == "OPTIONS":
-        return jsonify({}), 200
+def load_shop_reviews(place_id):
+    # CachedReview rows, or the embedded list of entries cached before it existed
+    reviews = [
+        {"author": r.author, "text": r.text, "date": r.date}
+        for r in CachedReview.top(place_id)
+    ]
+    if not reviews:
+        raw = CachedShop._get_collection().find_one({"place_id": place_id}, {"reviews": 1}) or {}
+        reviews = sorted(
+            (r for r in raw.get("reviews", []) if r.get("text")),
+            key=lambda r: r["date"], reverse=True
+        )
+    return reviews
+
+
+def rescore_cached_shop(cs, reviews, writes, cancelled=None):
+    # Older cache entries (or another model version) get scored once and persisted.
+    # False if the search stopped first (the reviews stay cached for next time)
+    texts = [r["text"] for r in reviews]
+    with inference_slots:
+        if stopped(cancelled):
+            return False
+        scored = score_reviews(texts)
+    if stopped(cancelled):
+        return False
+    xai = describe_reviews(texts, scored)
+    summary = xai["summary"]
+    cs.review_ratings = xai["ratings"]
+    cs.summary = summary
+    cs.xai_explanation = xai["user_friendly_explanation"]
+    cs.model_version = model_version()
+    if not xai["ok"]:
+        # served for this response only; the next search tries again
+        logger.warning(f"[{cs.place_id}] Scoring or GPT failed, result not cached")
+        return True
+
+    writes.replace_many(
+        CachedReview, {"place_id": cs.place_id},
+        CachedReview.documents_for_shop(cs.place_id, reviews, xai["ratings"], xai["probs"])
+    )
+    writes.update(CachedShop, {"place_id": cs.place_id}, {
+        "$set": {
+            "review_ratings": cs.review_ratings,
+            "summary": cs.summary,
+            "xai_explanation": cs.xai_explanation,
+            "model_version": cs.model_version,
+        },
+        "$unset": {"reviews": ""},
+    })
+    return True
+
+
+def process_cached_shop(cs, review_count):
+    top = cs.review_ratings[:review_count]
+    return {
+        "name":        cs.name,
+        "address":     cs.address,
+        "rating":      cs.rating,
+        "place_id":    cs.place_id,
+        "lat":         cs.lat,
+        "lng":         cs.lng,
+        "review_count": len(top),
+        "predicted_rating": round(sum(top) / len(top), 2) if top else 0.0,
+        "summary":     cs.summary,
+        "xai_explanations": cs.xai_explanation,
+        "phone":       cs.phone or None,
+        "opening_hours": cs.opening_hours or None,
+        "weekday_text":  cs.weekday_text or []
+    }
 
-    data = request.get_json()
+
+CACHED_SHOP_LIGHT_FIELDS = (
+    "place_id", "name", "rating", "address", "lat", "lng", "cached_at",
+    "phone", "opening_hours", "weekday_text",
+    "review_ratings", "summary", "xai_explanation", "model_version",
+)
+
+
+def prefetch_candidates(place_ids, cutoff):
+    """
+    One $in query per collection for every candidate: the recent zero-review
+    ids, and cached shops without their reviews (loaded on demand).
+    """
+    zero_ids = set(
+        ZeroReviewShop.objects(place_id__in=place_ids, added_at__gte=cutoff).scalar("place_id")
+    )
+    cached = {
+        cs.place_id: cs
+        for cs in CachedShop.objects(place_id__in=place_ids).only(*CACHED_SHOP_LIGHT_FIELDS)
+    }
+    return zero_ids, cached
+
+
+def process_candidate(place, review_count, prefetched, product_key, writes, cancelled=None):
+    pid = place["place_id"]
+    zero_ids, cached = prefetched
+
+    #  skip recent zero-review
+    if pid in zero_ids:
+        return None
+
+    # cache hit? stored ratings need no reviews; older entries load them to score
+    cs = cached.get(pid)
+    if cs and cs.is_cache_valid():
+        if cs.has_predictions(model_version(), review_count):
+            return process_cached_shop(cs, review_count)
+        reviews = load_shop_reviews(pid)
+        if len(reviews) >= review_count:
+            if not rescore_cached_shop(cs, reviews, writes, cancelled):
+                return None
+            return process_cached_shop(cs, review_count)
+
+    # live scrape
+    return process_live_shop(place, review_count, product_key, writes, cancelled)
+
+
+def iter_valid_shops(places, review_count, prefetched, product_key, writes, limit=5):
+    """
+    Score candidates on a bounded pool, topping it up in candidate order, and
+    yield each valid shop as soon as it is ready. Stops after `limit` shops
+    (or when the caller closes the generator) and cancels in-flight scrapes.
+    """
+    found = 0
+    cancelled = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=Config.SCRAPE_CONCURRENCY)
+    remaining = iter(places)
+    running = set()
+
+    def submit_next():
+        place = next(remaining, None)
+        if place is not None:
+            running.add(pool.submit(process_candidate, place, review_count, prefetched, product_key, writes, cancelled))
+
+    try:
+        for _ in range(Config.SCRAPE_CONCURRENCY):
+            submit_next()
+
+        while running and found < limit:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                running.discard(f)
+                try:
+                    shop = f.result()
+                except Exception:
+                    logger.exception("Candidate processing failed")
+                    shop = None
+                if shop and found < limit:
+                    found += 1
+                    yield shop
+                if found < limit:
+                    submit_next()
+    finally:
+        cancelled.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SearchError(Exception):
+    def __init__(self, status, payload):
+        super().__init__(payload.get("error"))
+        self.status = status
+        self.payload = payload
+
+
+def parse_search(data):
     product_name = data.get("product")
-    review_count  = data.get("reviewCount", 5)
-    coverage      = data.get("coverage", 1)
     location      = data.get("location", {})
-    skip_ids      = set(data.get("offset", []))
 
     # Validate inputs
     if not product_name:
-        return jsonify({"error": "Product name is required"}), 400
+        raise SearchError(400, {"error": "Product name is required"})
     if not location.get("lat") or not location.get("lng"):
-        return jsonify({"error": "User location is required"}), 400
-
-    lat, lng = location["lat"], location["lng"]
-    radius   = int(coverage) * 1000
+        raise SearchError(400, {"error": "User location is required"})
 
     # Parse date/time filters
     opening_date = None
@@ -129,73 +371,74 @@ def search_product():
         if filter_type == "datetime":
             opening_time = datetime.strptime(data["openingTime"], "%H:%M:%S").time()
 
-    # Fetch & filter by date/time (if any)
-    cache_key = f"shops_{product_name}_{lat}_{lng}_{radius}_{opening_date}_{opening_time}"
+    return {
+        "product_name": product_name,
+        "review_count": data.get("reviewCount", 5),
+        "lat":          location["lat"],
+        "lng":          location["lng"],
+        "radius":       int(data.get("coverage", 1)) * 1000,
+        "skip_ids":     set(data.get("offset", [])),
+        "opening_date": opening_date,
+        "opening_time": opening_time,
+    }
+
+
+def find_candidates(params):
+    product_name, lat, lng, radius = params["product_name"], params["lat"], params["lng"], params["radius"]
+    opening_date, opening_time = params["opening_date"], params["opening_time"]
+
+    # Fetch & filter by date/time (if any). Results are cached per geohash tile
+    # and radius bucket, so nearby users share them
+    tile = geohash_encode(lat, lng, Config.SEARCH_CACHE_GEOHASH_PRECISION)
+    tile_lat, tile_lng = geohash_center(tile)
+    # the user can be anywhere in the tile: grow the search so the tile
+    # centre's circle always covers the user's own circle
+    bucket = radius_bucket(radius + geohash_half_diagonal_m(tile), Config.SEARCH_CACHE_RADIUS_STEP_M)
+    cache_key = f"shops_{normalize_product(product_name)}_{tile}_{bucket}_{opening_date}_{opening_time}"
     try:
         shops_results = cache.get(cache_key)
         if isinstance(shops_results, str):
             shops_results = json.loads(shops_results)
         if not shops_results:
-            shops_results = fetch_and_filter_shops_with_text(
+            shops_results = find_shops_cache_first(
                 product_name,
-                lat, lng,
-                radius,
+                tile_lat, tile_lng,
+                bucket,
                 opening_date=opening_date,
                 opening_time=opening_time
             )
             cache.set(cache_key, shops_results, timeout=300)
     except Exception as e:
-        return jsonify({"error": "Failed to fetch shops", "details": str(e)}), 500
+        raise SearchError(500, {"error": "Failed to fetch shops", "details": str(e)})
+
+    # tile results → this user's own radius
+    if shops_results:
+        dist_m = calculate_distances(
+            lat, lng,
+            [s["geometry"]["location"]["lat"] for s in shops_results],
+            [s["geometry"]["location"]["lng"] for s in shops_results],
+        ) * 1000
+        shops_results = [s for s, d in zip(shops_results, dist_m) if d <= radius]
 
     if not shops_results:
-        return jsonify({"error": "No shops found"}), 404
+        raise SearchError(404, {"error": "No shops found"})
 
-    # Zero-review & cache-check & live-scrape → build valid_shops
-    valid_shops = []
-    cutoff = datetime.utcnow() - timedelta(days=1)
+    return [p for p in shops_results if p["place_id"] not in params["skip_ids"]]
 
-    for place in shops_results:
-        pid = place["place_id"]
-        if pid in skip_ids:
-            continue
-
-        #  skip recent zero-review
-        if ZeroReviewShop.objects(place_id=pid, added_at__gte=cutoff).first():
-            continue
-
-        # cache hit?
-        cs = CachedShop.objects(place_id=pid).first()
-        if cs and cs.is_cache_valid() and len(cs.reviews or []) >= review_count:
-            texts = sorted(cs.reviews, key=lambda r: r["date"], reverse=True)[:review_count]
-            xai = predict_review_rating_with_explanations([t["text"] for t in texts])
-            avg_pred = round(sum(xai["ratings"]) / len(texts), 2) if texts else 0.0
-
-            valid_shops.append({
-                "name":        cs.name,
-                "address":     cs.address,
-                "rating":      cs.rating,
-                "place_id":    cs.place_id,
-                "lat":         cs.lat,
-                "lng":         cs.lng,
-                "review_count": len(texts),
-                "predicted_rating": avg_pred,
-                "summary":     generate_summary([t["text"] for t in texts]),
-                "xai_explanations": xai["user_friendly_explanation"],
-                "phone":       cs.phone or None,
-                "opening_hours": cs.opening_hours or None,
-                "weekday_text":  cs.weekday_text or []
-            })
-        else:
-            # c) live scrape
-            shop = process_live_shop(place, review_count)
-            if shop:
-                valid_shops.append(shop)
 
-        if len(valid_shops) >= 5:
-            break
+def start_scoring(params, candidates, writes):
+    # Zero-review & cache-check & live-scrape → valid shops, as they finish
+    cutoff = datetime.utcnow() - timedelta(days=1)
+    prefetched = prefetch_candidates([p["place_id"] for p in candidates], cutoff)
+    return iter_valid_shops(
+        candidates, params["review_count"], prefetched,
+        normalize_product(params["product_name"]), writes
+    )
+
 
+def rank_and_enrich(valid_shops, writes):
     if not valid_shops:
-        return jsonify({"error": "No valid shops after processing"}), 404
+        raise SearchError(404, {"error": "No valid shops after processing"})
 
     preds = [s["predicted_rating"] for s in valid_shops if s["predicted_rating"] > 0]
     global_avg = round(sum(preds) / len(preds), 2) if preds else 4.2
@@ -206,11 +449,15 @@ def search_product():
     valid_shops.sort(key=lambda s: s["predicted_rating"], reverse=True)
     final_shops = valid_shops[:5]
 
-    # 4) Enrich phone/opening only if missing, then persist
+    # 4) Enrich phone/opening only if missing (one cached, concurrent lookup), then persist
+    details_map = get_place_details_many([
+        s["place_id"] for s in final_shops
+        if not s.get("phone") or not s.get("opening_hours")
+    ])
     for shop in final_shops:
         need_fetch = not shop.get("phone") or not shop.get("opening_hours")
         if need_fetch:
-            details = fetch_place_details(shop["place_id"])
+            details = details_map.get(shop["place_id"], {})
             oh    = details.get("opening_hours", {}) or {}
             wd    = oh.get("weekday_text", [])
             phone = details.get("formatted_phone_number", "N/A")
@@ -220,11 +467,144 @@ def search_product():
             shop.setdefault("weekday_text", [])
 
         # persist phone & opening if we fetched them just now
-        CachedShop.objects(place_id=shop["place_id"]).update_one(
-            set__phone=shop["phone"],
-            set__opening_hours=shop["opening_hours"],
-            set__weekday_text=shop["weekday_text"],
-            upsert=True
-        )
+        writes.upsert(CachedShop, {"place_id": shop["place_id"]}, {"$set": {
+            "phone": shop["phone"],
+            "opening_hours": shop["opening_hours"],
+            "weekday_text": shop["weekday_text"],
+            "hours_index": compile_opening_hours(shop["opening_hours"]),
+        }})
+
+    return final_shops
+
+
+def run_search(data, writes):
+    """Whole pipeline: fetch → scrape/score → Bayesian ranking → enrich."""
+    params = parse_search(data)
+    candidates = find_candidates(params)
+    return rank_and_enrich(list(start_scoring(params, candidates, writes)), writes)
+
+
+def run_search_job(app, job_id, data):
+    SearchJob.objects(job_id=job_id).update(set__status="running", set__started_at=datetime.utcnow())
+    writes = WriteBuffer()
+    update = {}
+    try:
+        with app.app_context():
+            final_shops = run_search(data, writes)
+        update = dict(set__status="done", set__status_code=200,
+                      set__result=json.dumps(final_shops, default=str))
+    except SearchError as e:
+        update = dict(set__status="failed", set__status_code=e.status, set__error=e.payload)
+    except Exception as e:
+        logger.exception(f"Search job {job_id} failed")
+        update = dict(set__status="failed", set__status_code=500,
+                      set__error={"error": "Search failed", "details": str(e)})
+    finally:
+        writes.flush()
+        SearchJob.objects(job_id=job_id).update(set__finished_at=datetime.utcnow(), **update)
+
+
+def ndjson(event):
+    return json.dumps(event, default=str) + "\n"
+
+
+@product_bp.route("/search_product", methods=["POST", "OPTIONS"])
+def search_product():
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+
+    # cache/zero-review upserts are batched and sent once the response is out
+    writes = WriteBuffer()
+
+    @after_this_request
+    def flush_writes(response):
+        response.call_on_close(writes.flush)
+        return response
+
+    try:
+        final_shops = run_search(request.get_json(), writes)
+    except SearchError as e:
+        return jsonify(e.payload), e.status
 
     return safe_jsonify(final_shops)
+
+
+@product_bp.route("/search_product/stream", methods=["POST", "OPTIONS"])
+def search_product_stream():
+    """
+    Same search as /search_product, streamed as NDJSON: a {"type": "shop"}
+    line per shop as soon as it is scored, then {"type": "result"} with the
+    Bayesian-adjusted ranking, or a single {"type": "error"} line.
+    """
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+
+    data = request.get_json()
+
+    def events():
+        writes = WriteBuffer()
+        shops_iter = None
+        try:
+            params = parse_search(data)
+            candidates = find_candidates(params)
+            shops_iter = start_scoring(params, candidates, writes)
+            valid_shops = []
+            for shop in shops_iter:
+                valid_shops.append(shop)
+                yield ndjson({"type": "shop", "shop": shop})
+            yield ndjson({"type": "result", "shops": rank_and_enrich(valid_shops, writes)})
+        except SearchError as e:
+            yield ndjson({"type": "error", "status": e.status, **e.payload})
+        except Exception as e:
+            logger.exception("Streaming search failed")
+            yield ndjson({"type": "error", "status": 500, "error": "Search failed", "details": str(e)})
+        finally:
+            if shops_iter is not None:
+                shops_iter.close()
+            writes.flush()
+
+    return Response(events(), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@product_bp.route("/search_jobs", methods=["POST", "OPTIONS"])
+def create_search_job():
+    """Queue a search and return its job id straight away (202)."""
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+
+    data = request.get_json()
+    try:
+        parse_search(data)  # reject bad input now rather than in the job
+    except SearchError as e:
+        return jsonify(e.payload), e.status
+
+    job = SearchJob(job_id=uuid.uuid4().hex, request=data).save()
+    search_job_pool.submit(run_search_job, current_app._get_current_object(), job.job_id, data)
+    return jsonify(job.as_status()), 202
+
+
+@product_bp.route("/search_jobs/<job_id>", methods=["GET"])
+def search_job_status(job_id):
+    job = SearchJob.objects(job_id=job_id).exclude("result", "request").first()
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.as_status()), 200
+
+
+@product_bp.route("/search_jobs/<job_id>/result", methods=["GET"])
+def search_job_result(job_id):
+    job = SearchJob.objects(job_id=job_id).exclude("request").first()
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status == "failed":
+        return jsonify(job.error), job.status_code or 500
+    if job.status != "done":
+        # not ready yet: same body as the status endpoint
+        return jsonify(job.as_status()), 202
+    return jsonify({"shops": json.loads(job.result)}), 200
+
+
+@product_bp.route("/search_cache/stats", methods=["GET"])
+def search_cache_stats():
+    return jsonify(cache.cache.stats()), 200
@@ -3,14 +3,23 @@ Services package for handling external API interactions and business logic.
 """
 __version__ = "1.0.0"
 
-from .google_maps_service import fetch_and_filter_shops_with_text , fetch_place_details
-from .review_service import predict_review_rating_with_explanations, generate_summary
+from .google_maps_service import fetch_and_filter_shops_with_text , fetch_place_details , get_place_details_many , find_shops_cache_first
+from .review_service import predict_review_rating_with_explanations, generate_summary, score_reviews, describe_reviews, model_version
 from .google_scraper import fetch_real_reviews
+from .readiness import warm_up, start_warm_up, readiness
 
 __all__ = [
     "fetch_and_filter_shops_with_text",
     "predict_review_rating_with_explanations",
     "generate_summary",
-    "fetch_real_reviews"
-    "fetch_place_details"
+    "score_reviews",
+    "describe_reviews",
+    "model_version",
+    "fetch_real_reviews",
+    "fetch_place_details",
+    "get_place_details_many",
+    "find_shops_cache_first",
+    "warm_up",
+    "start_warm_up",
+    "readiness"
 ]
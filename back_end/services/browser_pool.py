@@ -0,0 +1,170 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+
+import psutil
+from playwright.async_api import async_playwright
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--js-flags=--max-old-space-size=256"
+]
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.active = 0          # open contexts
+        self.served = 0          # contexts handed out so far
+        self.retiring = False
+
+    def healthy(self):
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Warm Chromium instances shared by all scrapes on one event loop.
+
+    Each scrape gets a fresh context + page (a tab) on the least busy browser.
+    Waiting scrapes are served strictly first come, first served. A browser is
+    retired once it has served `max_pages` contexts, disconnects, or the
+    Chromium process tree grows past `max_rss_mb`, and closed when idle.
+    """
+
+    def __init__(self, size, max_tabs, max_pages, max_rss_mb):
+        self.size = size
+        self.max_tabs = max_tabs
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+
+        self._playwright = None
+        self._browsers = []
+        self._free = size * max_tabs
+        self._waiters = deque()
+        self._lock = None
+
+    #  Fair slot queue
+    async def _acquire_slot(self):
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release_slot()  # slot was handed over as we got cancelled
+            else:
+                self._waiters.remove(fut)
+            raise
+
+    def _release_slot(self):
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)  # hand the slot straight to the next waiter
+                return
+        self._free += 1
+
+    #  Browser lifecycle
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        pooled = _PooledBrowser(browser)
+        self._browsers.append(pooled)
+        logger.info(f"Browser pool: launched browser ({len(self._browsers)} running)")
+        return pooled
+
+    async def _close(self, pooled):
+        if pooled in self._browsers:
+            self._browsers.remove(pooled)
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Browser pool: error closing browser: {e}")
+
+    async def _checkout(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for b in [b for b in self._browsers if not b.browser.is_connected()]:
+                logger.warning("Browser pool: dropping disconnected browser")
+                await self._close(b)
+
+            candidates = [b for b in self._browsers if b.healthy() and b.active < self.max_tabs]
+            if candidates:
+                pooled = min(candidates, key=lambda b: b.active)
+            if not candidates or (pooled.active and self._live_count() < self.size):
+                pooled = await self._launch()
+            pooled.active += 1
+            pooled.served += 1
+            return pooled
+
+    async def _checkin(self, pooled):
+        pooled.active -= 1
+        if pooled.served >= self.max_pages:
+            pooled.retiring = True
+        if self._rss_mb() > self.max_rss_mb:
+            oldest = max((b for b in self._browsers if not b.retiring),
+                         key=lambda b: b.served, default=None)
+            if oldest is not None:
+                logger.info("Browser pool: Chromium RSS over limit, recycling a browser")
+                oldest.retiring = True
+        for b in [b for b in self._browsers if b.retiring and b.active == 0]:
+            await self._close(b)
+
+    def _live_count(self):
+        return sum(1 for b in self._browsers if b.healthy())
+
+    @staticmethod
+    def _rss_mb():
+        try:
+            procs = psutil.Process().children(recursive=True)
+            return sum(p.memory_info().rss for p in procs
+                       if "chrom" in p.name().lower()) / (1024 * 1024)
+        except Exception:
+            return 0
+
+    #  Public API
+    @asynccontextmanager
+    async def page(self, **context_kwargs):
+        await self._acquire_slot()
+        pooled = context = None
+        try:
+            pooled = await self._checkout()
+            context = await pooled.browser.new_context(**context_kwargs)
+            yield await context.new_page()
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Browser pool: error closing context: {e}")
+            if pooled is not None:
+                await self._checkin(pooled)
+            self._release_slot()
+
+    async def close(self):
+        for b in list(self._browsers):
+            await self._close(b)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+browser_pool = BrowserPool(
+    size=Config.BROWSER_POOL_SIZE,
+    max_tabs=Config.BROWSER_MAX_TABS,
+    max_pages=Config.BROWSER_MAX_PAGES,
+    max_rss_mb=Config.BROWSER_MAX_RSS_MB,
+)
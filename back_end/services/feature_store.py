@@ -0,0 +1,166 @@
+import os
+import hashlib
+import logging
+import threading
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class _FileLock:
+    """Exclusive inter-process lock on a sidecar file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = open(self.path, "a+b")
+        if fcntl:
+            fcntl.flock(self._fh, fcntl.LOCK_EX)
+        else:
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl:
+                fcntl.flock(self._fh, fcntl.LOCK_UN)
+            else:
+                self._fh.seek(0)
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._fh.close()
+
+
+class FeatureStore:
+    """
+    Append-only, content-addressed store of feature vectors.
+
+    Rows live in a raw float32 file that is read through np.memmap, so every
+    worker process shares the same pages. A text file lists one key per row;
+    a row only becomes visible once its key line is written.
+
+    The store holds at most max_rows rows: a write that would pass it starts
+    a new, empty generation and removes the old files (processes still
+    mapping them keep reading their valid rows until they next refresh).
+    """
+
+    def __init__(self, path: str, dim: int, max_rows: int = None):
+        self.path = path
+        self.dim = dim
+        self.max_rows = max_rows
+        self.row_bytes = dim * np.dtype(np.float32).itemsize
+        os.makedirs(path, exist_ok=True)
+        self.generation_path = os.path.join(path, "generation")
+        self.lock_path = os.path.join(path, ".lock")
+
+        self._lock = threading.Lock()
+        self._generation = None
+
+    def _files(self, generation: int):
+        return (os.path.join(self.path, f"features-{generation}.f32"),
+                os.path.join(self.path, f"index-{generation}.txt"))
+
+    def _read_generation(self) -> int:
+        try:
+            with open(self.generation_path, "r", encoding="ascii") as fh:
+                return int(fh.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    #  Index / memmap refresh
+    def _refresh(self):
+        generation = self._read_generation()
+        if generation != self._generation:
+            self._generation = generation
+            self.data_path, self.index_path = self._files(generation)
+            self._index = {}
+            self._index_offset = 0
+            self._rows = None
+
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="ascii") as fh:
+            fh.seek(self._index_offset)
+            for line in fh:
+                if not line.endswith("\n"):
+                    break  # partial line from a concurrent writer
+                self._index[line.strip()] = len(self._index)
+                self._index_offset += len(line)
+
+        if self._index and (self._rows is None or self._rows.shape[0] < len(self._index)):
+            self._rows = np.memmap(self.data_path, dtype=np.float32, mode="r",
+                                   shape=(len(self._index), self.dim))
+
+    def _rotate(self):
+        # caller holds the file lock
+        old = self._files(self._generation)
+        tmp = self.generation_path + ".tmp"
+        with open(tmp, "w", encoding="ascii") as fh:
+            fh.write(str(self._generation + 1))
+        os.replace(tmp, self.generation_path)
+        for p in old:
+            try:
+                os.remove(p)
+            except OSError as e:  # still mapped on Windows
+                logger.warning(f"Could not remove old feature store file {p}: {e}")
+        self._refresh()
+        logger.info(f"Feature store {self.path} reached {self.max_rows} rows, started generation {self._generation}")
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def get_many(self, texts: list[str]) -> dict:
+        """Return {position in texts: feature row} for every stored text."""
+        keys = [text_key(t) for t in texts]
+        with self._lock:
+            if self._generation is None or any(k not in self._index for k in keys):
+                self._refresh()
+            return {
+                i: np.array(self._rows[self._index[k]])
+                for i, k in enumerate(keys) if k in self._index
+            }
+
+    def _new_rows(self, texts, X) -> dict:
+        new = {}
+        for t, row in zip(texts, X):
+            k = text_key(t)
+            if k not in self._index and k not in new:
+                new[k] = row
+        return new
+
+    def put_many(self, texts: list[str], X: np.ndarray):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        with self._lock, _FileLock(self.lock_path):
+            self._refresh()
+            new = self._new_rows(texts, X)
+            if not new:
+                return
+            if self.max_rows and len(self._index) + len(new) > self.max_rows:
+                self._rotate()
+                new = dict(list(self._new_rows(texts, X).items())[:self.max_rows])
+
+            # rows first, keys second: readers never see a key without its row
+            with open(self.data_path, "ab") as fh:
+                fh.seek(len(self._index) * self.row_bytes)
+                fh.truncate()
+                fh.write(np.vstack(list(new.values())).tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+            with open(self.index_path, "a", encoding="ascii") as fh:
+                fh.write("".join(k + "\n" for k in new))
+            self._refresh()
@@ -1,53 +1,161 @@
-import time
-import requests
-from datetime import datetime, date, time as _time
+import asyncio
+import logging
+import httpx
+from datetime import datetime, date, timedelta, time as _time
+from pymongo import UpdateOne
 from tenacity import retry, wait_fixed, stop_after_attempt
 from config import Config
-from utils import calculate_distance, is_open_on
+from utils import (
+    calculate_distances,
+    run_async,
+    PlaceDetails,
+    CachedShop,
+    compile_opening_hours,
+    filter_open,
+    normalize_product,
+)
+
+logger = logging.getLogger(__name__)
+
+TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+
+# A next_page_token becomes valid a moment after it is issued; poll it on this
+# schedule (seconds before each try) instead of one blind 2 s sleep
+PAGE_TOKEN_DELAYS = (1.0, 0.5, 0.5, 1.0, 2.0)
+
+#  Pooled HTTP clients (keep-alive to maps.googleapis.com)
+_limits = httpx.Limits(
+    max_connections=Config.PLACES_MAX_CONNECTIONS,
+    max_keepalive_connections=Config.PLACES_MAX_KEEPALIVE,
+    keepalive_expiry=60,
+)
+http_client = httpx.Client(timeout=30, limits=_limits)
+_async_client = None
+
+def async_http_client():
+    # created lazily so it binds to the background loop that first uses it
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(timeout=30, limits=_limits)
+    return _async_client
 
 @retry(wait=wait_fixed(2), stop=stop_after_attempt(3))
-def get_google_response(url):
-    resp = requests.get(url, timeout=30)
+async def get_google_response_async(url, params=None):
+    resp = await async_http_client().get(url, params=params)
     resp.raise_for_status()
     return resp.json()
 
-def fetch_all_shops(product_name, lat, lng, radius):
-    base = "https://maps.googleapis.com/maps/api/place/textsearch/json?"
-    all_shops = []
-    next_page = None
-
-    while True:
-        qs = (
-            f"query={product_name}+store"
-            f"&location={lat},{lng}"
-            f"&radius={radius}"
-            f"&type=store"
-            f"&key={Config.GOOGLE_API_KEY}"
-        )
-        if next_page:
-            qs += f"&pagetoken={next_page}"
-            time.sleep(2)
-        data = get_google_response(base + qs)
+async def _fetch_next_page_async(page_token):
+    params = {"pagetoken": page_token, "key": Config.GOOGLE_API_KEY}
+    data = {}
+    for delay in PAGE_TOKEN_DELAYS:
+        await asyncio.sleep(delay)
+        data = await get_google_response_async(TEXT_SEARCH_URL, params)
+        if data.get("status") != "INVALID_REQUEST":
+            break
+    return data
+
+async def fetch_all_shops_async(product_name, lat, lng, radius):
+    params = {
+        "query": f"{product_name} store",
+        "location": f"{lat},{lng}",
+        "radius": radius,
+        "type": "store",
+        "key": Config.GOOGLE_API_KEY,
+    }
+    data = await get_google_response_async(TEXT_SEARCH_URL, params)
+    all_shops = list(data.get("results", []))
+
+    next_page = data.get("next_page_token")
+    while next_page:
+        data = await _fetch_next_page_async(next_page)
         all_shops.extend(data.get("results", []))
         next_page = data.get("next_page_token")
-        if not next_page:
-            break
 
     return all_shops
 
-def fetch_place_details(place_id):
+def fetch_all_shops(product_name, lat, lng, radius):
+    # the page-token waits sleep on the background loop, but the calling
+    # thread still blocks here for the whole pagination: a Waitress thread
+    # serving /search_product stays busy (/search_jobs runs it off-request)
+    return run_async(fetch_all_shops_async(product_name, lat, lng, radius))
 
+def _details_params(place_id):
     fields = ["name", "rating", "opening_hours", "formatted_phone_number"]
-    url = (
-        "https://maps.googleapis.com/maps/api/place/details/json"
-        f"?place_id={place_id}"
-        f"&fields={','.join(fields)}"
-        f"&key={Config.GOOGLE_API_KEY}"
-    )
-    resp = requests.get(url, timeout=30)
+    return {
+        "place_id": place_id,
+        "fields": ",".join(fields),
+        "key": Config.GOOGLE_API_KEY,
+    }
+
+def fetch_place_details(place_id):
+    resp = http_client.get(DETAILS_URL, params=_details_params(place_id))
+    resp.raise_for_status()
+    return resp.json().get("result", {})
+
+async def fetch_place_details_async(place_id):
+    resp = await async_http_client().get(DETAILS_URL, params=_details_params(place_id))
     resp.raise_for_status()
     return resp.json().get("result", {})
 
+#  Cached, concurrent place details
+async def _fetch_details_many_async(place_ids):
+    sem = asyncio.Semaphore(Config.PLACE_DETAILS_CONCURRENCY)
+
+    async def one(pid):
+        async with sem:
+            try:
+                return pid, await fetch_place_details_async(pid)
+            except Exception as e:
+                logger.warning(f"[{pid}] Place details fetch failed: {e}")
+                return pid, None
+
+    return dict(await asyncio.gather(*(one(pid) for pid in place_ids)))
+
+def get_place_details_many(place_ids):
+    """
+    {place_id: details} for every id whose details could be resolved, read from
+    PlaceDetails while fresh and otherwise fetched concurrently and stored.
+    """
+    place_ids = list(dict.fromkeys(place_ids))
+    if not place_ids:
+        return {}
+
+    fresh_after = datetime.utcnow() - PlaceDetails.TTL
+    found = {
+        d.place_id: d.as_google_result()
+        for d in PlaceDetails.objects(place_id__in=place_ids, fetched_at__gte=fresh_after)
+    }
+
+    missing = [pid for pid in place_ids if pid not in found]
+    if missing:
+        fetched = {pid: d for pid, d in run_async(_fetch_details_many_async(missing)).items() if d is not None}
+        for d in fetched.values():
+            d["hours_index"] = compile_opening_hours(d.get("opening_hours"))
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"place_id": pid},
+                {"$set": {
+                    "opening_hours": d.get("opening_hours", {}) or {},
+                    "hours_index": d["hours_index"],
+                    "phone": d.get("formatted_phone_number", "N/A"),
+                    "fetched_at": now,
+                }},
+                upsert=True,
+            )
+            for pid, d in fetched.items()
+        ]
+        if ops:
+            try:
+                PlaceDetails._get_collection().bulk_write(ops, ordered=False)
+            except Exception:
+                logger.exception("Failed to store place details")
+        found.update(fetched)
+
+    return found
+
 def fetch_and_filter_shops_with_text(
     product_name: str,
     lat: float,
@@ -57,39 +165,114 @@ def fetch_and_filter_shops_with_text(
     opening_time: _time = None
 ):
 
-    candidates = fetch_all_shops(product_name, lat, lng, radius_m)
-    filtered = []
-
-    for shop in candidates:
-        pid = shop.get("place_id")
-        if not pid or "rating" not in shop:
-            continue
+    candidates = [
+        s for s in fetch_all_shops(product_name, lat, lng, radius_m)
+        if s.get("place_id") and "rating" in s
+    ]
 
-        # distance filter
-        s_lat = shop["geometry"]["location"]["lat"]
-        s_lng = shop["geometry"]["location"]["lng"]
-        if calculate_distance(lat, lng, s_lat, s_lng) * 1000 > radius_m:
-            continue
-
-        # if no date/time filter, include basic info only
-        if opening_date is None:
-            filtered.append(shop)
-            continue
+    # distance filter (vectorized)
+    dist_m = calculate_distances(
+        lat, lng,
+        [s["geometry"]["location"]["lat"] for s in candidates],
+        [s["geometry"]["location"]["lng"] for s in candidates],
+    ) * 1000
+    nearby = [s for s, d in zip(candidates, dist_m) if d <= radius_m]
 
-        # fetch details for opening_hours & phone
-        try:
-            details = fetch_place_details(pid)
-            oh = details.get("opening_hours", {}) or {}
-        except Exception:
-            continue  # skip on details-error
+    # if no date/time filter, include basic info only
+    if opening_date is None:
+        filtered = nearby
+    else:
+        # details for opening_hours & phone (shops without details are skipped)
+        details_map = get_place_details_many([s["place_id"] for s in nearby])
+        with_details = [s for s in nearby if s["place_id"] in details_map]
+        details = [details_map[s["place_id"]] for s in with_details]
+        compiled = [
+            d.get("hours_index") or compile_opening_hours(d.get("opening_hours"))
+            for d in details
+        ]
 
-        # only include if open on that date/time
-        if is_open_on(oh, opening_date, opening_time):
+        # only include if open on that date/time (one vectorized check)
+        is_open = filter_open(compiled, opening_date, opening_time)
+        filtered = []
+        for shop, d, hidx, ok in zip(with_details, details, compiled, is_open):
+            if not ok:
+                continue
+            oh = d.get("opening_hours", {}) or {}
             shop["opening_hours"] = oh
             shop["weekday_text"]  = oh.get("weekday_text", [])
-            shop["phone"]         = details.get("formatted_phone_number", "N/A")
+            shop["phone"]         = d.get("formatted_phone_number", "N/A")
+            shop["hours_index"]   = hidx
             filtered.append(shop)
 
     # sort by Google rating desc
     filtered.sort(key=lambda s: s.get("rating", 0), reverse=True)
     return filtered
+
+#  Cache-first candidate source
+def find_local_shops(product_name, lat, lng, radius_m, opening_date=None, opening_time=None):
+    """
+    Fresh cached shops that matched this product within radius_m, shaped like
+    Text Search results, or None when local coverage is too thin to trust.
+    """
+    fresh_after = datetime.utcnow() - timedelta(days=Config.LOCAL_MAX_AGE_DAYS)
+    shops = list(
+        CachedShop.objects(
+            products=normalize_product(product_name),
+            cached_at__gte=fresh_after,
+            location__near=[lng, lat],
+            location__max_distance=radius_m,
+        ).only(
+            "place_id", "name", "rating", "address", "lat", "lng",
+            "phone", "opening_hours", "weekday_text", "hours_index",
+        )
+    )
+    if opening_date is not None:
+        # shops whose hours we never compiled can't be filtered locally
+        shops = [s for s in shops if s.hours_index]
+    if len(shops) < Config.LOCAL_MIN_CANDIDATES:
+        return None
+
+    if opening_date is not None:
+        is_open = filter_open([s.hours_index for s in shops], opening_date, opening_time)
+        shops = [s for s, ok in zip(shops, is_open) if ok]
+
+    results = []
+    for s in shops:
+        shop = {
+            "place_id": s.place_id,
+            "name": s.name,
+            "rating": s.rating or 0,
+            "formatted_address": s.address or "N/A",
+            "geometry": {"location": {"lat": s.lat, "lng": s.lng}},
+        }
+        if opening_date is not None:
+            shop["opening_hours"] = s.opening_hours or {}
+            shop["weekday_text"] = s.weekday_text or []
+            shop["phone"] = s.phone or "N/A"
+            shop["hours_index"] = s.hours_index
+        results.append(shop)
+
+    results.sort(key=lambda s: s.get("rating", 0), reverse=True)
+    return results
+
+def find_shops_cache_first(product_name, lat, lng, radius_m, opening_date=None, opening_time=None):
+    try:
+        local = find_local_shops(product_name, lat, lng, radius_m, opening_date, opening_time)
+    except Exception:
+        logger.exception("Local candidate search failed")
+        local = None
+    if local is not None:
+        logger.info(f"Serving {len(local)} '{product_name}' candidates from the local cache")
+        return local
+
+    results = fetch_and_filter_shops_with_text(
+        product_name, lat, lng, radius_m,
+        opening_date=opening_date, opening_time=opening_time
+    )
+    # remember the match on shops we already cache, growing local coverage
+    try:
+        CachedShop.objects(place_id__in=[s["place_id"] for s in results])\
+                  .update(add_to_set__products=normalize_product(product_name))
+    except Exception:
+        logger.exception("Failed to tag cached shops with product")
+    return results
@@ -2,29 +2,51 @@ import hashlib
 import datetime
 import logging
 import asyncio
-
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
-
-# Setup
-torch.set_num_threads(1)
-nltk.download("stopwords", quiet=True)
-nltk.download("wordnet", quiet=True)
-nltk.download("omw-1.4", quiet=True)
-
-stop_words = set(stopwords.words("english"))
-lemmatizer = WordNetLemmatizer()
-
-# Load model
-tokenizer = AutoTokenizer.from_pretrained("models/aiReviewModel")
-model = AutoModelForSequenceClassification.from_pretrained("models/aiReviewModel")
-model.eval()
+import threading
+
+from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+from config import Config
+from utils import ensure_nltk_data
+from .browser_pool import browser_pool
+from .inference_backend import SequenceClassifier
+from . import inference_service
+
+# Text preprocessing (load_text_tools) and the fake-review detector
+# (load_detector, in the inference workers or inline), loaded on first use
+stop_words = lemmatizer = None
+tokenizer = model = None
+_load_lock = threading.Lock()
+
+def load_text_tools():
+    global stop_words, lemmatizer
+    if lemmatizer is not None:
+        return
+    with _load_lock:
+        if lemmatizer is not None:
+            return
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+
+        ensure_nltk_data("stopwords", "wordnet", "omw-1.4")
+        stop_words = set(stopwords.words("english"))
+        lemmatizer = WordNetLemmatizer()
+
+def load_detector():
+    global tokenizer, model
+    if model is not None:
+        return
+    with _load_lock:
+        if model is not None:
+            return
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained("models/aiReviewModel")
+        model = SequenceClassifier("models/aiReviewModel", Config.DETECTOR_MODEL_BACKEND,
+                                   threads=Config.DETECTOR_MODEL_THREADS)
 
 def preprocess_review(text):
+    load_text_tools()
     if not isinstance(text, str) or not text.strip():
         return ""
     return " ".join(lemmatizer.lemmatize(w.lower()) for w in text.split() if w.lower() not in stop_words)
@@ -49,15 +71,21 @@ def parse_relative_date(date_str):
         pass
     return now
 
+def _detect_labels(texts):
+    load_detector()
+    inputs = tokenizer(texts, padding=True, truncation=True, return_tensors="pt", max_length=256)
+    logits, _ = model(inputs)
+    return logits.argmax(axis=-1)
+
 def detect_fake_reviews(texts):
     try:
         valid_texts = [t for t in texts if t.strip()]
         if not valid_texts:
             return [], []
-        inputs = tokenizer(valid_texts, padding=True, truncation=True, return_tensors="pt", max_length=256)
-        with torch.no_grad():
-            logits = model(**inputs).logits
-        preds = torch.argmax(logits, dim=-1).tolist()
+        if inference_service.enabled():
+            preds = inference_service.inference_service().detect(valid_texts).tolist()
+        else:
+            preds = _detect_labels(valid_texts).tolist()
         real = [t for t, p in zip(valid_texts, preds) if p == 0]
         fake = [t for t, p in zip(valid_texts, preds) if p == 1]
         return real, fake
@@ -65,123 +93,159 @@ def detect_fake_reviews(texts):
         logging.error(f"Error in detect_fake_reviews: {e}")
         return [], texts
 
+# Expands "See more" and returns {total, cards: [{author, text, date}]} for the
+# cards loaded from index `start` on (cards before the cursor were already read)
+EXTRACT_REVIEWS_JS = """
+async (start) => {
+    const all = document.querySelectorAll("div.jftiEf");
+    const cards = Array.from(all).slice(start);
+    let expanded = false;
+    for (const card of cards) {
+        const more = card.querySelector("button[aria-label='See more']");
+        if (more) { more.click(); expanded = true; }
+    }
+    if (expanded) await new Promise(r => setTimeout(r, 150));
+    const read = (card, sel, dflt) => {
+        const el = card.querySelector(sel);
+        return el ? el.innerText.trim() : dflt;
+    };
+    return {
+        total: all.length,
+        cards: cards.map(card => ({
+            author: read(card, "div.d4r55", "Unknown"),
+            text: read(card, "span.wiI7pd", ""),
+            date: read(card, "span.rsqaWe", "today"),
+        })),
+    };
+}
+"""
+
+async def extract_cards_bulk(page, place_id, start=0):
+    try:
+        res = await page.evaluate(EXTRACT_REVIEWS_JS, start)
+        return res["total"], res["cards"]
+    except Exception as e:
+        logging.warning(f"[{place_id}] Bulk extraction failed, using per-element: {e}")
+        return await extract_cards_per_element(page, place_id, start)
+
+async def extract_cards_per_element(page, place_id, start=0):
+    elements = await page.query_selector_all("div.jftiEf")
+    cards = []
+    for el in elements[start:]:
+        try:
+            await el.hover()
+            see_more = await el.query_selector("button[aria-label='See more']")
+            if see_more:
+                await see_more.click()
+
+            author_el = await el.query_selector("div.d4r55")
+            text_el = await el.query_selector("span.wiI7pd")
+            date_el = await el.query_selector("span.rsqaWe")
+
+            cards.append({
+                "author": (await author_el.inner_text()).strip() if author_el else "Unknown",
+                "text": (await text_el.inner_text()).strip() if text_el else "",
+                "date": (await date_el.inner_text()).strip() if date_el else "today",
+            })
+        except Exception as e:
+            logging.warning(f"[{place_id}] Error extracting review: {e}")
+    return len(elements), cards
+
+def parse_cards(cards, seen_hashes):
+    batch = []
+    for c in cards:
+        author, text = c.get("author") or "Unknown", c.get("text") or ""
+        if not text:
+            continue
+        proc = preprocess_review(text)
+        if not proc:
+            continue
+        hash_key = hashlib.md5((author + text).encode()).hexdigest()
+        if hash_key in seen_hashes:
+            continue
+        seen_hashes.add(hash_key)
+
+        batch.append({
+            "author": author,
+            "text": text,
+            "date": parse_relative_date(c.get("date") or "today"),
+            "processed_text": proc
+        })
+    return batch
+
 async def fetch_real_reviews(place_id, max_reviews, retries=3):  
     logging.info(f"[{place_id}] Starting review fetch")
     reviews = []
     seen_hashes = set()
     scroll_fails = 0
+    cursor = 0  # cards before this index were handled in an earlier pass
 
-    async with async_playwright() as p:
-        logging.info(f"[{place_id}] Launching browser")
-        try:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    "--disable-gpu",
-                    "--no-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--js-flags=--max-old-space-size=256"  
-                ]
-            )
-            context = await browser.new_context(user_agent="Mozilla/5.0")
-            page = await context.new_page()
-
-            try:
-                for attempt in range(1, retries + 1):
-                    try:
-                        logging.info(f"[{place_id}] Navigating to Google Maps (Attempt {attempt})")
-                        await page.goto(f"https://www.google.com/maps/place/?q=place_id:{place_id}", timeout=30000)
-                        break
-                    except PlaywrightTimeout:
-                        if attempt < retries:
-                            logging.warning(f"[{place_id}] Timeout on attempt {attempt}, retrying...")
-                            await asyncio.sleep(5 * attempt)
-                        else:
-                            logging.error(f"[{place_id}] Failed to load page after {retries} attempts")
-                            return []
-
-                logging.info(f"[{place_id}] Waiting for reviews button")
-                await page.wait_for_selector("button[aria-label*='Reviews for']", timeout=10000)
-                logging.info(f"[{place_id}] Clicking reviews tab")
-                await page.click("button[aria-label*='Reviews for']")
-                await page.wait_for_timeout(1000)
-
-                while len(reviews) < max_reviews and scroll_fails < 2:
-                    logging.info(f"[{place_id}] Querying review elements")
-                    elements = await page.query_selector_all("div.jftiEf")
-                    before = len(elements)
-                    batch = []
-                    for el in elements:
-                        try:
-                            await el.hover()
-                            see_more = await el.query_selector("button[aria-label='See more']")
-                            if see_more:
-                                await see_more.click()
-
-                            author_el = await el.query_selector("div.d4r55")
-                            text_el = await el.query_selector("span.wiI7pd")
-                            date_el = await el.query_selector("span.rsqaWe")
-
-                            author = (await author_el.inner_text()).strip() if author_el else "Unknown"
-                            text = (await text_el.inner_text()).strip() if text_el else ""
-                            date_s = (await date_el.inner_text()).strip() if date_el else "today"
-
-                            if not text:
-                                continue
-
-                            dt = parse_relative_date(date_s)
-                            proc = preprocess_review(text)
-                            if not proc:
-                                continue
-                            hash_key = hashlib.md5((author + text).encode()).hexdigest()
-                            if hash_key in seen_hashes:
-                                continue
-                            seen_hashes.add(hash_key)
-
-                            batch.append({
-                                "author": author,
-                                "text": text,
-                                "date": dt,
-                                "processed_text": proc
-                            })
-                        except Exception as e:
-                            logging.warning(f"[{place_id}] Error extracting review: {e}")
-                            continue
-
-                    if batch:
-                        real_proc, _ = detect_fake_reviews([b["processed_text"] for b in batch])
-                        reviews += [r for r in batch if r["processed_text"] in real_proc]
-
-                    after = len(await page.query_selector_all("div.jftiEf"))
-                    scroll_fails = scroll_fails + 1 if after == before else 0
-
-                    logging.info(f"[{place_id}] Reviews: {len(reviews)}, Scroll fails: {scroll_fails}")
-
-                    try:
-                        await page.eval_on_selector(
-                            "div.m6QErb.DxyBCb.kA9KIf.dS8AEf",
-                            "(el) => el.scrollBy(0, el.scrollHeight)"
-                        )
-                        await page.wait_for_timeout(1000)
-                    except Exception as e:
-                        logging.warning(f"[{place_id}] Scroll failed: {e}")
-                        break
-
-            except Exception as e:
-                logging.error(f"[{place_id}] Unexpected error in review fetching: {e}")
-                return []
-            finally:
-                logging.info(f"[{place_id}] Closing browser resources")
+    # first use loads the NLTK data; keep that off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, load_text_tools)
+
+    try:
+        logging.info(f"[{place_id}] Waiting for a browser tab")
+        async with browser_pool.page(user_agent="Mozilla/5.0") as page:
+            for attempt in range(1, retries + 1):
                 try:
-                    await page.close()
-                    await context.close()
-                    await browser.close()
+                    logging.info(f"[{place_id}] Navigating to Google Maps (Attempt {attempt})")
+                    await page.goto(f"https://www.google.com/maps/place/?q=place_id:{place_id}", timeout=30000)
+                    break
+                except PlaywrightTimeout:
+                    if attempt < retries:
+                        logging.warning(f"[{place_id}] Timeout on attempt {attempt}, retrying...")
+                        await asyncio.sleep(5 * attempt)
+                    else:
+                        logging.error(f"[{place_id}] Failed to load page after {retries} attempts")
+                        return []
+
+            logging.info(f"[{place_id}] Waiting for reviews button")
+            await page.wait_for_selector("button[aria-label*='Reviews for']", timeout=10000)
+            logging.info(f"[{place_id}] Clicking reviews tab")
+            await page.click("button[aria-label*='Reviews for']")
+            await page.wait_for_timeout(1000)
+
+            while len(reviews) < max_reviews and scroll_fails < 2:
+                logging.info(f"[{place_id}] Extracting review cards from #{cursor}")
+                if Config.SCRAPER_EXTRACT_MODE == "element":
+                    total, cards = await extract_cards_per_element(page, place_id, cursor)
+                else:
+                    total, cards = await extract_cards_bulk(page, place_id, cursor)
+                if total < cursor:
+                    # list was re-rendered: rescan from the top, seen_hashes drops repeats
+                    cursor = 0
+                    continue
+                cursor = total
+                batch = parse_cards(cards, seen_hashes)
+
+                # one fake-review pass per scroll, off the event loop
+                if batch:
+                    real_proc, _ = await asyncio.get_running_loop().run_in_executor(
+                        None, detect_fake_reviews, [b["processed_text"] for b in batch]
+                    )
+                    real_proc = set(real_proc)
+                    reviews += [r for r in batch if r["processed_text"] in real_proc]
+
+                scroll_fails = scroll_fails + 1 if not cards else 0
+
+                logging.info(f"[{place_id}] Reviews: {len(reviews)}, Scroll fails: {scroll_fails}")
+
+                try:
+                    await page.eval_on_selector(
+                        "div.m6QErb.DxyBCb.kA9KIf.dS8AEf",
+                        "(el) => el.scrollBy(0, el.scrollHeight)"
+                    )
+                    await page.wait_for_timeout(1000)
                 except Exception as e:
-                    logging.error(f"[{place_id}] Error closing browser: {e}")
+                    logging.warning(f"[{place_id}] Scroll failed: {e}")
+                    break
 
-        except Exception as e:
-            logging.error(f"[{place_id}] Failed to launch browser: {e}")
-            return []
+    except asyncio.CancelledError:
+        logging.info(f"[{place_id}] Review fetch cancelled")
+        raise
+    except Exception as e:
+        logging.error(f"[{place_id}] Unexpected error in review fetching: {e}")
+        return []
 
-        reviews.sort(key=lambda x: x["date"], reverse=True)
-        return reviews[:max_reviews]
\ No newline at end of file
+    reviews.sort(key=lambda x: x["date"], reverse=True)
+    return reviews[:max_reviews]
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import logging
+
+import numpy as np
+import torch
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "int8", "onnx")
+
+_torch_threads_set = False
+
+
+def set_torch_threads():
+    # torch's intra-op pool is process-wide: size it once for every model here
+    global _torch_threads_set
+    if not _torch_threads_set and Config.TORCH_THREADS:
+        torch.set_num_threads(Config.TORCH_THREADS)
+        _torch_threads_set = True
+
+PARITY_CSV = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), os.pardir,
+    "Models", "ModelTesting", "Ai_Genuine_ReviewsTest", "DataPreparation", "DataSet", "test.csv",
+)
+
+
+class _ExportWrapper(torch.nn.Module):
+    # tensors only, so torch.onnx.export can trace it: (logits, CLS embedding)
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        out = self.model(input_ids=input_ids, attention_mask=attention_mask, output_hidden_states=True)
+        return out.logits, out.hidden_states[-1][:, 0, :]
+
+
+class SequenceClassifier:
+    """
+    A Hugging Face sequence classifier behind one of three CPU backends:
+    "torch" (eager fp32), "int8" (dynamic int8 quantized Linear layers) or
+    "onnx" (ONNX Runtime; exported once into ONNX_DIR).
+
+    __call__ takes the tokenizer's "pt" output and returns numpy
+    (logits, CLS embedding of the last layer or None). `threads` sets the
+    ONNX Runtime intra-op threads for this model; the torch backends share
+    the process-wide pool sized by TORCH_THREADS.
+    """
+
+    def __init__(self, path, backend="torch", name=None, threads=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}' (expected one of {BACKENDS})")
+        self.path = path
+        self.backend = backend
+        self.name = name or os.path.basename(os.path.normpath(path))
+        self.threads = threads
+
+        # ONNX keeps only the ORT session resident; torch is loaded just to export
+        self.model = None
+        self.session = None
+        if backend == "onnx":
+            self.session = self._onnx_session()
+            return
+        set_torch_threads()
+        model = self._load_torch()
+        if backend == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+
+    def _load_torch(self):
+        from transformers import AutoModelForSequenceClassification
+
+        model = AutoModelForSequenceClassification.from_pretrained(self.path)
+        model.eval()
+        return model
+
+    def _onnx_session(self):
+        import onnxruntime as ort
+
+        onnx_path = os.path.join(Config.ONNX_DIR, f"{self.name}.onnx")
+        if not os.path.exists(onnx_path):
+            self.export_onnx(onnx_path)
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            opts.intra_op_num_threads = self.threads
+        return ort.InferenceSession(onnx_path, opts, providers=["CPUExecutionProvider"])
+
+    def export_onnx(self, onnx_path):
+        os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+        dummy = {
+            "input_ids": torch.ones((2, 8), dtype=torch.long),
+            "attention_mask": torch.ones((2, 8), dtype=torch.long),
+        }
+        axes = {0: "batch", 1: "sequence"}
+        tmp = onnx_path + f".{os.getpid()}.tmp"
+        torch.onnx.export(
+            _ExportWrapper(self._load_torch()),
+            (dummy["input_ids"], dummy["attention_mask"]),
+            tmp,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits", "cls"],
+            dynamic_axes={"input_ids": axes, "attention_mask": axes, "logits": {0: "batch"}, "cls": {0: "batch"}},
+            opset_version=14,
+        )
+        os.replace(tmp, onnx_path)  # other workers never see a half-written file
+        logger.info(f"Exported {self.name} to {onnx_path}")
+
+    def __call__(self, inputs, hidden=False):
+        if self.session is not None:
+            feeds = {k: inputs[k].cpu().numpy().astype(np.int64) for k in ("input_ids", "attention_mask")}
+            logits, cls = self.session.run(["logits", "cls"], feeds)
+            return logits, (cls if hidden else None)
+
+        with torch.no_grad():
+            out = self.model(**inputs, output_hidden_states=hidden)
+        cls = out.hidden_states[-1][:, 0, :].cpu().numpy() if hidden else None
+        return out.logits.cpu().numpy(), cls
+
+
+#  Parity check against eager fp32
+def check_parity(path, backend, texts, batch_size=32, hidden=False):
+    """Compare `backend` with eager fp32 on texts; returns max diffs and label agreement."""
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    reference = SequenceClassifier(path, "torch")
+    candidate = SequenceClassifier(path, backend)
+
+    ref_logits, cand_logits, ref_cls, cand_cls = [], [], [], []
+    timings = {"torch": 0.0, backend: 0.0}
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                           max_length=256, return_tensors="pt")
+        for clf, logits_out, cls_out in ((reference, ref_logits, ref_cls), (candidate, cand_logits, cand_cls)):
+            t0 = time.perf_counter()
+            logits, cls = clf(inputs, hidden=hidden)
+            timings[clf.backend] += time.perf_counter() - t0
+            logits_out.append(logits)
+            if hidden:
+                cls_out.append(cls)
+
+    ref_logits, cand_logits = np.vstack(ref_logits), np.vstack(cand_logits)
+    ref_p = torch.softmax(torch.from_numpy(ref_logits), dim=-1).numpy()
+    cand_p = torch.softmax(torch.from_numpy(cand_logits), dim=-1).numpy()
+    report = {
+        "model": path,
+        "backend": backend,
+        "rows": len(texts),
+        "max_logit_diff": float(np.abs(ref_logits - cand_logits).max()),
+        "max_prob_diff": float(np.abs(ref_p - cand_p).max()),
+        "label_agreement": float((ref_logits.argmax(-1) == cand_logits.argmax(-1)).mean()),
+        "seconds": {k: round(v, 2) for k, v in timings.items()},
+    }
+    if hidden:
+        report["max_cls_diff"] = float(np.abs(np.vstack(ref_cls) - np.vstack(cand_cls)).max())
+    return report
+
+
+# python -m services.inference_backend [int8|onnx] [rows]
+if __name__ == "__main__":
+    import json
+    import pandas as pd
+
+    backend = sys.argv[1] if len(sys.argv) > 1 else "onnx"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    texts = pd.read_csv(PARITY_CSV)["clean_review"].dropna().astype(str).tolist()[:rows]
+
+    for path, hidden in (("models/aiReviewModel", False), ("models/reviewPredictionModel/distilbert_model", True)):
+        print(json.dumps(check_parity(path, backend, texts, hidden=hidden), indent=2))
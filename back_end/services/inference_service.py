@@ -0,0 +1,178 @@
+import time
+import queue
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+#  Worker process side
+def _init_worker():
+    # each worker owns its own copy of both DistilBERT models
+    from .review_service import load_encoder
+    from .google_scraper import load_detector
+    load_encoder()
+    load_detector()
+
+def _ping(_):
+    return True
+
+def _encode_task(texts):
+    from .review_service import _distilbert_outputs
+    return _distilbert_outputs(texts, Config.INFERENCE_BATCH_SIZE)
+
+def _detect_task(texts):
+    from .google_scraper import _detect_labels
+    return (_detect_labels(texts),)
+
+TASKS = {"encode": _encode_task, "detect": _detect_task}
+
+
+#  Server side: micro-batching in front of the pool
+class MicroBatcher:
+    """
+    Merges concurrent requests for one task into a single batch: the first
+    request opens a `window_s` window and everything queued until it closes
+    (or until `max_batch` texts) goes to a worker together. Each caller gets
+    its own slice of the task's output arrays back.
+    """
+
+    def __init__(self, service, task, window_s, max_batch):
+        self.service = service
+        self.task = task
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name=f"microbatch-{task}", daemon=True).start()
+
+    def submit(self, texts) -> Future:
+        fut = Future()
+        self._queue.put((list(texts), fut))
+        return fut
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.window_s
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            texts = [t for item, _ in batch for t in item]
+            try:
+                fut = self.service.submit(TASKS[self.task], texts)
+            except Exception as e:
+                self._fail(batch, e)
+                continue
+            fut.add_done_callback(lambda f, batch=batch: self._split(f, batch))
+
+    def _split(self, fut, batch):
+        try:
+            outputs = fut.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self.service.reset()
+            self._fail(batch, e)
+            return
+        self.service.warm = True
+        start = 0
+        for texts, caller in batch:
+            end = start + len(texts)
+            caller.set_result(tuple(np.asarray(o)[start:end] for o in outputs))
+            start = end
+
+    @staticmethod
+    def _fail(batch, exc):
+        for _, caller in batch:
+            caller.set_exception(exc)
+
+
+class InferenceService:
+    """Process pool owning the DistilBERT models, fed through per-task micro-batchers."""
+
+    def __init__(self, workers, window_s, max_batch, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self.warm = False           # a worker has loaded its models
+        self._pool = None
+        self._lock = threading.Lock()
+        self._batchers = {task: MicroBatcher(self, task, window_s, max_batch) for task in TASKS}
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: never fork a process that already runs threads and OpenMP
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._pool
+
+    def reset(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            logger.warning("Inference pool broke, starting a new one")
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn, texts):
+        try:
+            return self._executor().submit(fn, texts)
+        except BrokenProcessPool:
+            self.reset()
+            return self._executor().submit(fn, texts)
+
+    def warm_up(self):
+        # one task per worker so every process starts and loads its models
+        for f in [self._executor().submit(_ping, i) for i in range(self.workers)]:
+            f.result()
+        self.warm = True
+
+    def _call(self, task, texts):
+        return self._batchers[task].submit(texts).result(timeout=self.timeout)
+
+    def encode(self, texts):
+        """(CLS embeddings, softmax logits) from the rating DistilBERT."""
+        return self._call("encode", texts)
+
+    def detect(self, texts):
+        """Fake-review labels (1 = fake) from the detector."""
+        return self._call("detect", texts)[0]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+def enabled() -> bool:
+    return Config.INFERENCE_WORKERS > 0
+
+def is_warm() -> bool:
+    return _service is not None and _service.warm
+
+def inference_service() -> InferenceService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = InferenceService(
+                workers=Config.INFERENCE_WORKERS,
+                window_s=Config.INFERENCE_BATCH_WINDOW_MS / 1000,
+                max_batch=Config.INFERENCE_MAX_BATCH,
+                timeout=Config.INFERENCE_TIMEOUT_S,
+            )
+        return _service
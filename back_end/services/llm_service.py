@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import logging
+
+from openai import AsyncOpenAI
+
+from config import Config
+from utils import LLMResponse, run_async
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-3.5-turbo"
+
+# completions that failed come back as text starting with this (never cached)
+FAILURE_PREFIX = "GPT summarization failed"
+
+_client = None
+_slots = None
+
+
+def _async_client():
+    # created lazily so the client and semaphore bind to the background loop
+    global _client, _slots
+    if _client is None:
+        _client = AsyncOpenAI(api_key=Config.GPT_API_KEY)
+        _slots = asyncio.Semaphore(Config.LLM_CONCURRENCY)
+    return _client, _slots
+
+
+def _model() -> str:
+    # the stub gets its own keys, so its output never answers a real request
+    return "stub" if Config.LLM_BACKEND == "stub" else MODEL
+
+
+def cache_key(model: str, instruction: str, raw_text: str, max_tokens: int) -> str:
+    h = hashlib.sha256()
+    for part in (model, instruction, raw_text, str(max_tokens)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+async def _openai_complete(raw_text, instruction, max_tokens):
+    client, slots = _async_client()
+    async with slots:
+        resp = await client.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": instruction},
+                {"role": "user",   "content": raw_text}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.7
+        )
+    return resp.choices[0].message.content.strip()
+
+
+async def _stub_complete(raw_text, instruction, max_tokens):
+    # deterministic, offline stand-in for tests and benchmarks
+    await asyncio.sleep(Config.LLM_STUB_LATENCY_S)
+    digest = hashlib.sha256((instruction + raw_text).encode("utf-8")).hexdigest()[:8]
+    return f"[stub {digest}] " + " ".join(raw_text.split()[:max_tokens // 4])
+
+
+async def complete_async(raw_text: str, instruction: str = "Summarize this:", max_tokens: int = 200) -> str:
+    key = cache_key(_model(), instruction, raw_text, max_tokens)
+    try:
+        hit = await asyncio.to_thread(lambda: LLMResponse.objects(key=key).first())
+    except Exception:
+        logger.exception("LLM cache read failed")
+        hit = None
+    if hit is not None:
+        return hit.text
+
+    try:
+        if Config.LLM_BACKEND == "stub":
+            text = await _stub_complete(raw_text, instruction, max_tokens)
+        else:
+            text = await _openai_complete(raw_text, instruction, max_tokens)
+    except Exception as e:
+        return f"{FAILURE_PREFIX}: {e}"
+
+    try:
+        await asyncio.to_thread(
+            lambda: LLMResponse.objects(key=key).update_one(set__text=text, upsert=True)
+        )
+    except Exception:
+        logger.exception("LLM cache write failed")
+    return text
+
+
+def failed(text: str) -> bool:
+    return text is None or text.startswith(FAILURE_PREFIX)
+
+
+def complete_many(requests: list[dict]) -> list[str]:
+    """Run several completions ({raw_text, instruction, max_tokens}) concurrently."""
+    async def _all():
+        return await asyncio.gather(*(complete_async(**r) for r in requests))
+    return run_async(_all())
+
+
+def complete(raw_text: str, instruction: str = "Summarize this:", max_tokens: int = 200) -> str:
+    return complete_many([{"raw_text": raw_text, "instruction": instruction, "max_tokens": max_tokens}])[0]
@@ -0,0 +1,55 @@
+import time
+import logging
+import threading
+
+from . import review_service, google_scraper, inference_service
+from .review_service import load_models, load_encoder
+from .google_scraper import load_detector, load_text_tools
+
+logger = logging.getLogger(__name__)
+
+_state = {"loading": False, "error": None, "warm_up_s": None}
+_lock = threading.Lock()
+
+
+def warm_up():
+    """Load every model up front; safe to call more than once."""
+    with _lock:
+        if models_ready() or _state["loading"]:
+            return
+        _state.update(loading=True, error=None)
+
+    started = time.monotonic()
+    try:
+        load_text_tools()
+        load_models()
+        if inference_service.enabled():
+            inference_service.inference_service().warm_up()
+        else:
+            load_encoder()
+            load_detector()
+        _state["warm_up_s"] = round(time.monotonic() - started, 2)
+        logger.info(f"Models loaded in {_state['warm_up_s']}s")
+    except Exception as e:
+        _state["error"] = str(e)
+        logger.exception("Model warm-up failed")
+    finally:
+        _state["loading"] = False
+
+
+def start_warm_up():
+    # background thread, so the server starts accepting requests right away
+    threading.Thread(target=warm_up, name="model-warm-up", daemon=True).start()
+
+
+def models_ready():
+    # whatever loaded them: warm-up or lazily on first use
+    if not (review_service.models_loaded() and google_scraper.lemmatizer is not None):
+        return False
+    if inference_service.enabled():
+        return inference_service.is_warm()
+    return review_service.distilbert_model is not None and google_scraper.model is not None
+
+
+def readiness():
+    return {**_state, "ready": models_ready()}
@@ -1,73 +1,48 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+from collections import Counter
 import joblib
 import numpy as np
+import scipy.sparse as sp
 import torch
-from openai import OpenAI
 import nltk
-import shap
-import pandas as pd
+import xgboost as xgb
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from lime.lime_text import LimeTextExplainer
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from afinn import Afinn
 from config import Config
+from utils import ensure_nltk_data
+from .feature_store import FeatureStore
+from .inference_backend import SequenceClassifier
+from . import inference_service
+from .llm_service import complete, complete_many, failed
 
-#  NLTK setup 
-nltk.download("punkt", quiet=True)
-nltk.download("averaged_perceptron_tagger", quiet=True)
-nltk.download("vader_lexicon", quiet=True)
+logger = logging.getLogger(__name__)
 
-#  OpenAI client 
-client = OpenAI(api_key=Config.GPT_API_KEY)
-
-#  Load models & vectorizers 
 BASE_PATH = "models/reviewPredictionModel/"
-distilbert_tokenizer = AutoTokenizer.from_pretrained(BASE_PATH + "distilbert_model")
-distilbert_model     = AutoModelForSequenceClassification.from_pretrained(BASE_PATH + "distilbert_model")
-distilbert_model.eval()
-
-xgb_model        = joblib.load(BASE_PATH + "xgb_hybrid_final.pkl")
-tfidf_vectorizer = joblib.load(BASE_PATH + "tfidf_vect_refit.pkl")
-scaler           = joblib.load(BASE_PATH + "scaler_refit.pkl")
-
-#  Patch Booster.predict for SHAP compatibility 
-booster = xgb_model.get_booster()
-_orig_predict = booster.predict
-
-def _patched_predict(data,
-                     output_margin=False,
-                     validate_features=True,
-                     iteration_range=None,
-                     **kwargs):
-    if "ntree_limit" in kwargs:
-        nt = kwargs.pop("ntree_limit")
-        iteration_range = (0, nt)
-    if iteration_range is None:
-        iteration_range = (0, booster.num_boosted_rounds())
-    return _orig_predict(
-        data,
-        output_margin=output_margin,
-        validate_features=validate_features,
-        iteration_range=iteration_range,
-        **kwargs
-    )
 
-booster.predict = _patched_predict
+#  Lazily loaded models & vectorizers (load_models() / warm-up)
+# Everything below stays None until load_models() runs, so importing this
+# module is cheap and never touches the network.
+distilbert_tokenizer = distilbert_model = None
+xgb_model = tfidf_vectorizer = scaler = booster = None
+sia = af = None
+tfidf_names = feature_names = pretty_names = None
+_FULL_DIM = None
+_ENCODER_DIM = 768 + 5       # CLS embedding + softmax logits
+_used_mask = None           # columns the booster splits on
+_pruning = None             # see _build_pruning(); None = compute every column
+feature_store = None
+_tree_explainer = None
 
-#  Explainability setup ─
-tree_explainer = shap.TreeExplainer(
-    xgb_model,
-    feature_perturbation="tree_path_dependent"
-)
-lime_explainer = LimeTextExplainer(class_names=[f"Rating {i}" for i in range(1, 6)])
+_load_lock = threading.Lock()
+_loaded = False
+_version_lock = threading.Lock()
+_model_version = None
 
-sia = SentimentIntensityAnalyzer()
-af  = Afinn()
-
-#  Build feature_names list
 bert_names   = [f"cls_{i}" for i in range(768)]
 logit_names  = [f"logit_{i}" for i in range(1, 6)]
-tfidf_names  = list(tfidf_vectorizer.get_feature_names_out())
 src_name     = ["source_dummy"]
 meta_names   = [
     "meta_token_count",
@@ -77,43 +52,170 @@ meta_names   = [
     "meta_adj_count",
     "meta_afinn_score",
 ]
-feature_names = bert_names + logit_names + tfidf_names + src_name + meta_names
-_FULL_DIM = len(feature_names)
-assert _FULL_DIM == (
-    768 + 5 + tfidf_vectorizer.get_feature_names_out().shape[0] + 1 + 6
-)
-
-#  Map to human-readable labels
-pretty_names = {
-    **{name: f"DistilBERT embedding #{i}" for i, name in enumerate(bert_names)},
-    **{f"logit_{i}": f"P(model={i})" for i in range(1, 6)},
-    **{name: f"word ‘{name.replace('tfidf_', '').replace('_', ' ’')}’" for name in tfidf_names},
-    "source_dummy": "Review source (dummy)",
-    "meta_token_count": "Number of words in review",
-    "meta_exclamations": "Count of ‘!’",
-    "meta_questions": "Count of ‘?’",
-    "meta_vader_compound": "Overall sentiment score (VADER)",
-    "meta_adj_count": "Number of adjectives",
-    "meta_afinn_score": "Sentiment score (Afinn)"
-}
-
-#  GPT Summary Function 
+
+def _patch_booster_predict(booster):
+    # Booster.predict for SHAP compatibility (ntree_limit → iteration_range)
+    _orig_predict = booster.predict
+
+    def _patched_predict(data,
+                         output_margin=False,
+                         validate_features=True,
+                         iteration_range=None,
+                         **kwargs):
+        if "ntree_limit" in kwargs:
+            nt = kwargs.pop("ntree_limit")
+            iteration_range = (0, nt)
+        if iteration_range is None:
+            iteration_range = (0, booster.num_boosted_rounds())
+        return _orig_predict(
+            data,
+            output_margin=output_margin,
+            validate_features=validate_features,
+            iteration_range=iteration_range,
+            **kwargs
+        )
+
+    booster.predict = _patched_predict
+
+def _booster_used_mask(booster, dim):
+    # get_score lists every feature with at least one split, by name or as "f<idx>"
+    names = booster.feature_names
+    index = {n: i for i, n in enumerate(names)} if names else {}
+    mask = np.zeros(dim, dtype=bool)
+    for name in booster.get_score(importance_type="weight"):
+        mask[index[name] if name in index else int(name[1:])] = True
+    return mask
+
+def _artifacts_digest(path: str) -> str:
+    # content hash of every file under path (DistilBERT, vectorizer, scaler, booster)
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            h.update(os.path.relpath(file_path, path).encode("utf-8") + b"\0")
+            with open(file_path, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    h.update(chunk)
+    return h.hexdigest()[:12]
+
+def model_version() -> str:
+    """
+    MODEL_VERSION plus a hash of the model files and the rating backend, so
+    retrained artifacts never reuse stored vectors or cached ratings.
+    """
+    global _model_version
+    if _model_version is None:
+        with _version_lock:
+            if _model_version is None:
+                version = f"{Config.MODEL_VERSION}_{_artifacts_digest(BASE_PATH)}"
+                if Config.RATING_MODEL_BACKEND != "torch":
+                    version += f"_{Config.RATING_MODEL_BACKEND}"
+                _model_version = version
+    return _model_version
+
+def load_encoder():
+    """Load the rating DistilBERT (in the inference workers, or inline)."""
+    global distilbert_tokenizer, distilbert_model
+    if distilbert_model is not None:
+        return
+    with _load_lock:
+        if distilbert_model is not None:
+            return
+        from transformers import AutoTokenizer
+        distilbert_tokenizer = AutoTokenizer.from_pretrained(BASE_PATH + "distilbert_model")
+        distilbert_model     = SequenceClassifier(BASE_PATH + "distilbert_model", Config.RATING_MODEL_BACKEND,
+                                                  threads=Config.RATING_MODEL_THREADS)
+
+def load_models():
+    """Load NLTK data, XGBoost and the vectorizers once (thread-safe)."""
+    global xgb_model, tfidf_vectorizer, scaler, booster
+    global sia, af, tfidf_names, feature_names, pretty_names, _FULL_DIM, _used_mask, _pruning, feature_store, _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        from afinn import Afinn
+
+        ensure_nltk_data("punkt", "averaged_perceptron_tagger", "vader_lexicon")
+        sia = SentimentIntensityAnalyzer()
+        af  = Afinn()
+
+
+        xgb_model        = joblib.load(BASE_PATH + "xgb_hybrid_final.pkl")
+        tfidf_vectorizer = joblib.load(BASE_PATH + "tfidf_vect_refit.pkl")
+        scaler           = joblib.load(BASE_PATH + "scaler_refit.pkl")
+        booster = xgb_model.get_booster()
+        _patch_booster_predict(booster)
+
+        #  Build feature_names list
+        tfidf_names   = list(tfidf_vectorizer.get_feature_names_out())
+        feature_names = bert_names + logit_names + tfidf_names + src_name + meta_names
+        _FULL_DIM = len(feature_names)
+        assert _FULL_DIM == (
+            768 + 5 + tfidf_vectorizer.get_feature_names_out().shape[0] + 1 + 6
+        )
+        _used_mask = _booster_used_mask(booster, _FULL_DIM)
+
+        #  Persistent store of DistilBERT outputs (shared by all worker
+        # processes), one per model version and backend
+        feature_store = (
+            FeatureStore(os.path.join(Config.FEATURE_STORE_DIR, model_version()), _ENCODER_DIM,
+                         max_rows=Config.FEATURE_STORE_MAX_ROWS)
+            if Config.FEATURE_STORE_ENABLED else None
+        )
+
+        #  Map to human-readable labels
+        pretty_names = {
+            **{name: f"DistilBERT embedding #{i}" for i, name in enumerate(bert_names)},
+            **{f"logit_{i}": f"P(model={i})" for i in range(1, 6)},
+            **{name: f"word ‘{name.replace('tfidf_', '').replace('_', ' ’')}’" for name in tfidf_names},
+            "source_dummy": "Review source (dummy)",
+            "meta_token_count": "Number of words in review",
+            "meta_exclamations": "Count of ‘!’",
+            "meta_questions": "Count of ‘?’",
+            "meta_vader_compound": "Overall sentiment score (VADER)",
+            "meta_adj_count": "Number of adjectives",
+            "meta_afinn_score": "Sentiment score (Afinn)"
+        }
+
+        # only trust pruned featurization once it reproduces the full path;
+        # published together with _loaded so no request sees it unverified
+        pruning = _build_pruning() if Config.FEATURE_PRUNING else None
+        if pruning is not None and not verify_pruning(pruning):
+            logger.warning("Pruned features changed predictions, computing every column")
+            pruning = None
+        _pruning = pruning
+        _loaded = True
+
+def models_loaded() -> bool:
+    return _loaded
+
+#  Explainability setup (only built when first needed)
+def tree_explainer():
+    global _tree_explainer
+    if _tree_explainer is None:
+        import shap
+        load_models()
+        _tree_explainer = shap.TreeExplainer(
+            xgb_model,
+            feature_perturbation="tree_path_dependent"
+        )
+    return _tree_explainer
+
+def lime_explainer():
+    # a fresh, seeded explainer per explanation: LIME's samples (and so the
+    # GPT explanation prompt and its cache key) are the same for the same review
+    from lime.lime_text import LimeTextExplainer
+    return LimeTextExplainer(class_names=[f"Rating {i}" for i in range(1, 6)], random_state=0)
+
+#  GPT Summary Function (cached, rate-limited: see llm_service)
 def generate_gpt_summary(raw_text: str,
                          instruction: str = "Summarize this:",
                          max_tokens: int = 200) -> str:
-    try:
-        resp = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": instruction},
-                {"role": "user",   "content": raw_text}
-            ],
-            max_tokens=max_tokens,
-            temperature=0.7
-        )
-        return resp.choices[0].message.content.strip()
-    except Exception as e:
-        return f"GPT summarization failed: {e}"
+    return complete(raw_text, instruction=instruction, max_tokens=max_tokens)
 
 #  Build XAI explanation prompt 
 def build_explanation_prompt(raw_explanation: str,
@@ -130,6 +232,7 @@ def build_explanation_prompt(raw_explanation: str,
 
 #  Meta-features 
 def compute_meta_features(text: str) -> np.ndarray:
+    load_models()
     tokens = nltk.word_tokenize(text)
     tagged = nltk.pos_tag(tokens)
     return np.array([[
@@ -141,52 +244,358 @@ def compute_meta_features(text: str) -> np.ndarray:
         af.score(text)
     ]], dtype=np.float32)
 
+def compute_meta_features_batch(texts: list[str], cols: np.ndarray = None) -> np.ndarray:
+    """
+    Same columns as compute_meta_features, with one tagger load per batch.
+    `cols` (6 bools) limits the work to those columns; the others stay 0.
+    """
+    load_models()
+    return _meta_features(texts, cols)
+
+def _meta_features(texts: list[str], cols: np.ndarray = None) -> np.ndarray:
+    cols = np.ones(6, dtype=bool) if cols is None else cols
+    out = np.zeros((len(texts), 6), dtype=np.float32)
+    if cols[0] or cols[4]:
+        tokens = [nltk.word_tokenize(t) for t in texts]
+        out[:, 0] = [len(tok) for tok in tokens]
+    if cols[1]:
+        out[:, 1] = [t.count("!") for t in texts]
+    if cols[2]:
+        out[:, 2] = [t.count("?") for t in texts]
+    if cols[3]:
+        out[:, 3] = [sia.polarity_scores(t)["compound"] for t in texts]
+    if cols[4]:
+        out[:, 4] = [sum(tag.startswith("JJ") for _, tag in tags) for tags in nltk.pos_tag_sents(tokens)]
+    if cols[5]:
+        out[:, 5] = [af.score(t) for t in texts]
+    return out
+
+#  DistilBERT forward pass (length-bucketed micro-batches)
+def _distilbert_outputs(texts: list[str], batch_size: int) -> tuple[np.ndarray, np.ndarray]:
+    load_encoder()
+    enc = distilbert_tokenizer(texts, truncation=True, max_length=256)
+    order = sorted(range(len(texts)), key=lambda i: len(enc["input_ids"][i]))
+    cls_emb = np.zeros((len(texts), 768), dtype=np.float32)
+    logits  = np.zeros((len(texts), 5), dtype=np.float32)
+
+    for start in range(0, len(order), batch_size):
+        idx = order[start:start + batch_size]
+        inputs = distilbert_tokenizer.pad(
+            {k: [enc[k][i] for i in idx] for k in enc.keys()},
+            padding=True, return_tensors="pt"
+        )
+        raw, cls = distilbert_model(inputs, hidden=True)
+        cls_emb[idx] = cls
+        logits[idx]  = torch.softmax(torch.from_numpy(raw), dim=-1).numpy()
+
+    return cls_emb, logits
+
+def encode_texts(texts: list[str], batch_size: int) -> tuple[np.ndarray, np.ndarray]:
+    # micro-batched in the inference workers when they are enabled
+    if inference_service.enabled():
+        return inference_service.inference_service().encode(texts)
+    return _distilbert_outputs(texts, batch_size)
+
+def encode_texts_stored(texts: list[str], batch_size: int) -> tuple[np.ndarray, np.ndarray]:
+    # DistilBERT is the only expensive part of a row: read its outputs from
+    # the feature store and encode (then store) just the misses
+    hits = {}
+    if feature_store is not None:
+        try:
+            hits = feature_store.get_many(texts)
+        except Exception as e:
+            logger.warning(f"Feature store read failed: {e}")
+
+    out = np.zeros((len(texts), _ENCODER_DIM), dtype=np.float32)
+    for i, row in hits.items():
+        out[i] = row
+
+    miss = [i for i in range(len(texts)) if i not in hits]
+    if miss:
+        cls_emb, logits = encode_texts([texts[i] for i in miss], batch_size)
+        out[miss] = np.hstack([cls_emb, logits])
+        if feature_store is not None:
+            try:
+                feature_store.put_many([texts[i] for i in miss], out[miss])
+            except Exception as e:
+                logger.warning(f"Feature store write failed: {e}")
+    return out[:, :768], out[:, 768:]
+
+#  Sparse feature rows
+# XGBoost reads an absent CSR entry as missing, while a dense 0 is a value.
+# Rows therefore keep an explicit (possibly zero) entry for every column the
+# booster splits on, so predictions and SHAP match the dense path exactly;
+# only zeros in columns no tree looks at are left out.
+def _block_coo(block: np.ndarray, offset: int):
+    n, w = block.shape
+    return (np.repeat(np.arange(n), w), np.tile(np.arange(offset, offset + w), n), block.ravel())
+
+def assemble_features(cls_emb: np.ndarray, logits: np.ndarray, tfidf: sp.spmatrix, meta_scaled: np.ndarray,
+                      prune: bool = False) -> sp.csr_matrix:
+    n = cls_emb.shape[0]
+    tfidf_off = 768 + 5
+    tail_off = tfidf_off + tfidf.shape[1]
+
+    head = np.hstack([cls_emb, logits]).astype(np.float32)
+    tail = np.hstack([np.zeros((n, 1), dtype=np.float32), meta_scaled]).astype(np.float32)
+
+    tfidf = tfidf.tocoo()
+    used_terms = np.flatnonzero(_used_mask[tfidf_off:tail_off])
+    keep = ~np.isin(tfidf.col, used_terms)  # used terms come from the dense slice below
+    used_vals = tfidf.tocsc()[:, used_terms].toarray().astype(np.float32)
+
+    parts = [
+        _block_coo(head, 0),
+        (np.repeat(np.arange(n), len(used_terms)), np.tile(used_terms + tfidf_off, n), used_vals.ravel()),
+        (tfidf.row[keep], tfidf.col[keep] + tfidf_off, tfidf.data[keep].astype(np.float32)),
+        _block_coo(tail, tail_off),
+    ]
+    rows, cols, vals = (np.concatenate(p) for p in zip(*parts))
+    if prune:
+        # zero-fill TF-IDF / meta columns no tree uses (the DistilBERT block is computed anyway)
+        sel = (cols < tfidf_off) | _used_mask[cols]
+        rows, cols, vals = rows[sel], cols[sel], vals[sel]
+    vals = np.nan_to_num(vals, nan=0.0, posinf=0.0, neginf=0.0)
+    return sp.csr_matrix((vals, (rows, cols)), shape=(n, _FULL_DIM), dtype=np.float32)
+
+def sparsify(X: np.ndarray) -> sp.csr_matrix:
+    """Dense feature rows → CSR, keeping explicit zeros in booster-used columns."""
+    rows, cols = np.nonzero((X != 0) | _used_mask)
+    return sp.csr_matrix((X[rows, cols].astype(np.float32), (rows, cols)), shape=X.shape, dtype=np.float32)
+
+#  Pruned featurization (booster-used columns only)
+def _build_pruning() -> dict:
+    tfidf_off = 768 + 5
+    tail_off = tfidf_off + len(tfidf_names)
+    used_terms = _used_mask[tfidf_off:tail_off]
+    pruning = {
+        "meta_cols": _used_mask[tail_off + 1:],
+        "used_terms": int(used_terms.sum()),
+        "vocab": None,
+    }
+    # with a norm every term of a review feeds the used columns' values, so
+    # only an unnormalized float64 TF-IDF can be computed on a reduced vocabulary
+    if tfidf_vectorizer.norm is None and np.dtype(tfidf_vectorizer.dtype) == np.float64:
+        pruning["vocab"] = {t: i for t, i in tfidf_vectorizer.vocabulary_.items() if used_terms[i]}
+        pruning["analyzer"] = tfidf_vectorizer.build_analyzer()
+    logger.info(
+        f"Feature pruning: {pruning['used_terms']}/{len(tfidf_names)} TF-IDF terms, "
+        f"{int(pruning['meta_cols'].sum())}/6 meta features used by the booster"
+    )
+    return pruning
+
+def _pruned_tfidf(texts: list[str], pruning: dict) -> sp.csr_matrix:
+    # TfidfVectorizer.transform restricted to the used vocabulary (norm=None)
+    vocab, analyze = pruning["vocab"], pruning["analyzer"]
+    rows, cols, counts = [], [], []
+    for r, text in enumerate(texts):
+        for term, c in Counter(w for w in analyze(text) if w in vocab).items():
+            rows.append(r)
+            cols.append(vocab[term])
+            counts.append(c)
+    tf = np.asarray(counts, dtype=np.float64)
+    cols = np.asarray(cols, dtype=np.int64)
+    if tfidf_vectorizer.binary:
+        tf = np.ones_like(tf)
+    if tfidf_vectorizer.sublinear_tf:
+        tf = np.log(tf) + 1
+    if tfidf_vectorizer.use_idf:
+        tf = tf * tfidf_vectorizer.idf_[cols]
+    return sp.csr_matrix((tf, (rows, cols)), shape=(len(texts), len(tfidf_names)))
+
+def _text_features(texts: list[str], cls_emb: np.ndarray, logits: np.ndarray, pruning: dict = None) -> sp.csr_matrix:
+    # pruning=None computes every column
+    if pruning is None:
+        tfidf = tfidf_vectorizer.transform(texts)
+        meta_scaled = scaler.transform(_meta_features(texts))
+        return assemble_features(cls_emb, logits, tfidf, meta_scaled)
+
+    tfidf = _pruned_tfidf(texts, pruning) if pruning["vocab"] is not None else tfidf_vectorizer.transform(texts)
+    meta_scaled = scaler.transform(_meta_features(texts, pruning["meta_cols"]))
+    return assemble_features(cls_emb, logits, tfidf, meta_scaled, prune=True)
+
+def _compare_features(full: sp.csr_matrix, pruned: sp.csr_matrix) -> dict:
+    nr = booster.num_boosted_rounds()
+    p_full = xgb_model.predict_proba(full, iteration_range=(0, nr))
+    p_pruned = xgb_model.predict_proba(pruned, iteration_range=(0, nr))
+    c_full, c_pruned = (
+        booster.predict(xgb.DMatrix(X, feature_names=booster.feature_names), pred_contribs=True, iteration_range=(0, nr))
+        for X in (full, pruned)
+    )
+    return {
+        "probs_identical": bool(np.array_equal(p_full, p_pruned)),
+        "contribs_identical": bool(np.array_equal(c_full, c_pruned)),
+        "max_prob_diff": float(np.abs(p_full - p_pruned).max()) if len(p_full) else 0.0,
+    }
+
+def verify_pruning(pruning: dict, texts: list[str] = None) -> bool:
+    """
+    Pruned vs full featurization on sample reviews (plus one made of every
+    used term): predictions and SHAP contributions must be bit-identical.
+    Runs inside load_models(), so it only uses the non-loading helpers.
+    """
+    used_terms = [t for t, i in tfidf_vectorizer.vocabulary_.items()
+                  if _used_mask[768 + 5 + i]]
+    texts = texts or PRUNING_CHECK_TEXTS + [
+        " ".join(used_terms[i:i + 40]) for i in range(0, len(used_terms), 40)
+    ]
+    rng = np.random.default_rng(0)
+    cls_emb = rng.normal(size=(len(texts), 768)).astype(np.float32)
+    logits = rng.dirichlet(np.ones(5), len(texts)).astype(np.float32)
+    try:
+        report = _compare_features(
+            _text_features(texts, cls_emb, logits),
+            _text_features(texts, cls_emb, logits, pruning),
+        )
+        return report["probs_identical"] and report["contribs_identical"]
+    except Exception as e:
+        logger.warning(f"Feature pruning check failed: {e}")
+        return False
+
+PRUNING_CHECK_TEXTS = [
+    "Great shop!! Friendly staff and the prices were fair.",
+    "Terrible service, waited 40 minutes and nobody helped me?",
+    "ok",
+    "The bread was fresh but the coffee was cold and bitter. Would I come back? Maybe.",
+    "",
+]
+
+def check_pruning(texts: list[str], batch_size: int = None) -> dict:
+    """Pruned vs full featurization on real reviews with real DistilBERT outputs."""
+    load_models()
+    pruning = _pruning or _build_pruning()
+    cls_emb, logits = encode_texts(texts, batch_size or Config.INFERENCE_BATCH_SIZE)
+
+    t0 = time.perf_counter()
+    full = _text_features(texts, cls_emb, logits)
+    t1 = time.perf_counter()
+    pruned = _text_features(texts, cls_emb, logits, pruning)
+    t2 = time.perf_counter()
+    return {
+        "rows": len(texts),
+        "pruning_active": _pruning is not None,
+        "tfidf_terms": f"{pruning['used_terms']}/{len(tfidf_names)}",
+        "reduced_vocabulary": pruning["vocab"] is not None,
+        "meta_features": int(pruning["meta_cols"].sum()),
+        **_compare_features(full, pruned),
+        "seconds": {"full": round(t1 - t0, 3), "pruned": round(t2 - t1, 3)},
+    }
+
 #  Combine features 
+def get_combined_features_batch(texts: list[str], batch_size: int = None, sparse: bool = False,
+                                persist: bool = False):
+    """
+    Feature rows for texts: dense ndarray, or model-ready CSR with sparse=True.
+    persist=True reads and stores the DistilBERT outputs in the feature store.
+    """
+    load_models()
+    if not texts:
+        X = np.zeros((0, _FULL_DIM), dtype=np.float32)
+        return sparsify(X) if sparse else X
+    batch_size = batch_size or Config.INFERENCE_BATCH_SIZE
+    try:
+        cls_emb, logits = (encode_texts_stored if persist else encode_texts)(texts, batch_size)
+
+        X = _text_features(texts, cls_emb, logits, _pruning)
+        return X if sparse else X.toarray()
+    except Exception as e:
+        if inference_service.enabled():
+            # per-review retries would each wait on the same stuck or broken pool
+            raise
+        logger.warning(f"Batched feature extraction failed, falling back to per-review: {e}")
+        X = np.vstack([get_combined_features(t) for t in texts])
+        return sparsify(X) if sparse else X
+
 def get_combined_features(text: str) -> np.ndarray:
+    load_models()
     try:
-        inputs = distilbert_tokenizer(
-            text, return_tensors="pt",
-            truncation=True, padding=True, max_length=256
-        )
-        with torch.no_grad():
-            out     = distilbert_model(**inputs, output_hidden_states=True)
-            cls_emb = out.hidden_states[-1][:,0,:].cpu().numpy()
-            logits  = torch.softmax(out.logits, dim=-1).cpu().numpy()
-
-        tfidf = tfidf_vectorizer.transform([text]).toarray().astype(np.float32)
-        meta = compute_meta_features(text)
-        meta_scaled = scaler.transform(meta)
-        src_enc = np.zeros((1,1), dtype=np.float32)
-
-        combined = np.hstack([cls_emb, logits, tfidf, src_enc, meta_scaled])
-        return np.nan_to_num(combined, nan=0.0, posinf=0.0, neginf=0.0)
+        cls_emb, logits = encode_texts([text], 1)
+
+        return _text_features([text], cls_emb, logits, _pruning).toarray()
     except Exception as e:
-        print(f"Feature extraction failed: {e}")
+        logger.warning(f"Feature extraction failed: {e}")
         return np.zeros((1, _FULL_DIM), dtype=np.float32)
 
+#  Feature rows, DistilBERT outputs served from the feature store
+def featurize(texts: list[str]) -> sp.csr_matrix:
+    # TF-IDF and meta features are cheap and recomputed; only successful
+    # batches are stored, so per-review fallback zero rows never persist
+    return get_combined_features_batch(texts, sparse=True, persist=True)
+
+#  Per-request feature context
+class FeatureContext:
+    """Computes each distinct text's (sparse) feature row once and reuses it."""
+
+    def __init__(self):
+        self._rows = {}
+
+    def features(self, texts: list[str], batch_size: int = None, persist: bool = True) -> sp.csr_matrix:
+        load_models()
+        miss = list(dict.fromkeys(t for t in texts if t not in self._rows))
+        if miss:
+            X = featurize(miss) if persist else get_combined_features_batch(miss, batch_size, sparse=True)
+            self._rows.update((t, X[i]) for i, t in enumerate(miss))
+        if not texts:
+            return sparsify(np.zeros((0, _FULL_DIM), dtype=np.float32))
+        return sp.vstack([self._rows[t] for t in texts], format="csr")
+
 #  Rating prediction 
-def predict_review_rating(reviews: list[str]) -> tuple[np.ndarray, np.ndarray]:
+def _predict_proba(X) -> np.ndarray:
+    # dense or CSR; the sklearn wrapper hands both to booster.inplace_predict
+    load_models()
+    nr = booster.num_boosted_rounds()
+    return xgb_model.predict_proba(X, iteration_range=(0, nr))
+
+def _score(reviews: list[str], ctx: FeatureContext) -> tuple[np.ndarray, np.ndarray, bool]:
+    # ok is False when prediction failed or any review fell back to an all-zero row
     try:
-        X = np.vstack([get_combined_features(r) for r in reviews])
-        nr = booster.num_boosted_rounds()
-        probs = xgb_model.predict_proba(X, iteration_range=(0, nr))
+        X = ctx.features(reviews)
+        probs = _predict_proba(X)
         ratings = np.dot(probs, np.arange(1, 6))
-        return ratings, probs
+        ok = bool((abs(X).sum(axis=1) != 0).all())
+        return ratings, probs, ok
     except Exception as e:
-        print(f"Prediction failed: {e}")
+        logger.warning(f"Prediction failed: {e}")
         n = len(reviews)
-        return np.zeros(n), np.zeros((n, 5))
+        return np.zeros(n), np.zeros((n, 5)), False
+
+def predict_review_rating(reviews: list[str], ctx: FeatureContext = None) -> tuple[np.ndarray, np.ndarray]:
+    ratings, probs, _ = _score(reviews, ctx or FeatureContext())
+    return ratings, probs
 
 #  Explanations 
-def get_explanations(review: str) -> dict:
-    df_feats = pd.DataFrame(get_combined_features(review).astype(np.float32), columns=feature_names)
+def _shap_values(x, cls: int) -> np.ndarray:
+    if Config.SHAP_BACKEND == "shap":
+        import pandas as pd
+        df_feats = pd.DataFrame(x.toarray() if sp.issparse(x) else x, columns=feature_names)
+        return tree_explainer().shap_values(df_feats)[cls][0]
+
+    # native TreeSHAP on a sparse DMatrix: (rows, classes, features + bias) → drop the bias column
+    dm = xgb.DMatrix(x, feature_names=booster.feature_names)
+    contribs = booster.predict(dm, pred_contribs=True)
+    return contribs.reshape(x.shape[0], 5, -1)[0, cls, :_FULL_DIM]
+
+def get_explanations(review: str,
+                     num_samples: int = None,
+                     deadline: float = None,
+                     ctx: FeatureContext = None,
+                     probs: np.ndarray = None) -> dict:
+    """
+    SHAP + LIME explanation for one review.
+
+    num_samples overrides LIME_NUM_SAMPLES (0 disables LIME); deadline is a
+    time.monotonic() value after which LIME is skipped instead of started.
+    Pass the request's ctx and the review's probs to avoid featurizing it again.
+    """
+    load_models()
+    ctx = ctx or FeatureContext()
+    x = ctx.features([review]).astype(np.float32)
     out = {"shap_full": [], "shap_top": [], "lime": [], "error": None}
 
     try:
-        sv = tree_explainer.shap_values(df_feats)
-        _, p = predict_review_rating([review])
-        cls = int(np.argmax(p[0]))
-        arr = sv[cls][0]
+        p = probs if probs is not None else _predict_proba(x)[0]
+        cls = int(np.argmax(p))
+        arr = _shap_values(x, cls)
         idx = np.argsort(np.abs(arr))[::-1][:8]
         out["shap_top"] = [
             {"feature": pretty_names[feature_names[i]], "value": float(arr[i])}
@@ -195,47 +604,100 @@ def get_explanations(review: str) -> dict:
     except Exception as e:
         out["error"] = f"SHAP failed: {e}"
 
+    num_samples = Config.LIME_NUM_SAMPLES if num_samples is None else num_samples
+    if deadline is not None and deadline - time.monotonic() < Config.LIME_MIN_BUDGET_S:
+        num_samples = 0
+    if num_samples <= 0:
+        logger.debug(f"Explanations: {out}")
+        return out
+
     try:
+        # LIME hands over every perturbation at once (the unperturbed review
+        # first, already in ctx): featurize the rest as one batch
         def _lm(texts: list[str]) -> np.ndarray:
-            return xgb_model.predict_proba(np.vstack([get_combined_features(t) for t in texts]))
-        le = lime_explainer.explain_instance(review, _lm, num_features=6, num_samples=150)
+            return _predict_proba(ctx.features(texts, batch_size=Config.LIME_BATCH_SIZE, persist=False))
+        le = lime_explainer().explain_instance(review, _lm, num_features=6, num_samples=num_samples)
         out["lime"] = le.as_list()
     except Exception as e:
         out["error"] = out.get("error") or str(e)
-    print(out)    
+    logger.debug(f"Explanations: {out}")
 
     return out
 
 #  Combined predict + explain 
-def predict_review_rating_with_explanations(reviews: list[str]) -> dict:
-    if not reviews:
-        return {"predicted_rating": 0.0, "ratings": [], "user_friendly_explanation": "No reviews provided.", "raw_explanation": ""}
+def score_reviews(reviews: list[str], latency_budget: float = None) -> dict:
+    """
+    Model-only half: ratings, probabilities and the GPT explanation prompt.
+    "ok" is False when featurization, prediction or SHAP failed, so the
+    result is fine to show but must not be cached.
+    """
+    latency_budget = latency_budget or Config.EXPLANATION_LATENCY_BUDGET_S
+    deadline = time.monotonic() + latency_budget if latency_budget else None
 
-    ratings, _ = predict_review_rating(reviews)
+    ctx = FeatureContext()
+    ratings, probs, ok = _score(reviews, ctx)
     avg = round(np.mean(ratings), 2)
-    ex = get_explanations(reviews[0])
+    ex = get_explanations(reviews[0], deadline=deadline, ctx=ctx, probs=probs[0])
     raw = "SHAP top contributions: " + " ".join( f"{d['feature']} {'+' if d['value']>0 else '-'}{abs(d['value']):.2f}" for d in ex['shap_top']) + "LIME top features:" + "".join(
         f"{t} {'+' if v>0 else '-'}{abs(v):.2f}" for t, v in ex['lime']
     )
-    prompt = build_explanation_prompt(raw, reviews[0], avg)
-    user_txt = generate_gpt_summary(prompt, max_tokens=200)
 
     return {
         "predicted_rating": avg,
         "ratings": ratings.tolist(),
-        "user_friendly_explanation": user_txt,
+        "probs": probs.tolist(),
+        "explanation_prompt": build_explanation_prompt(raw, reviews[0], avg),
+        "ok": ok and not (ex["error"] or "").startswith("SHAP failed"),
     }
 
-#  Review summary 
-def generate_summary(reviews: list[str]) -> str:
+def describe_reviews(reviews: list[str], scored: dict) -> dict:
+    """GPT half: explanation and summary requested concurrently ("ok" also covers both calls)."""
+    explanation, summary = complete_many([
+        {"raw_text": scored["explanation_prompt"], "instruction": "Summarize this:", "max_tokens": 200},
+        summary_request(reviews),
+    ])
+    ok = scored["ok"] and not failed(explanation) and not failed(summary)
+    return {**scored, "user_friendly_explanation": explanation, "summary": summary, "ok": ok}
+
+def predict_review_rating_with_explanations(reviews: list[str], latency_budget: float = None) -> dict:
     if not reviews:
-        return "No reviews."
+        return {"predicted_rating": 0.0, "ratings": [], "probs": [], "user_friendly_explanation": "No reviews provided.", "raw_explanation": ""}
 
+    scored = score_reviews(reviews, latency_budget)
+    user_txt = generate_gpt_summary(scored["explanation_prompt"], max_tokens=200)
+
+    return {
+        "predicted_rating": scored["predicted_rating"],
+        "ratings": scored["ratings"],
+        "probs": scored["probs"],
+        "user_friendly_explanation": user_txt,
+    }
+
+#  Review summary 
+def summary_request(reviews: list[str]) -> dict:
     review_blob = "".join(f"- {r.strip()}" for r in reviews)
     instruction = ("You are a helpful assistant. Here is a list of customer reviews:"f"{review_blob}"
         "Summarize what customers liked and disliked in a short, friendly paragraph. "
         "Avoid using '**Pros:**' or '**Cons:**' and bullet points. Instead, write one clear paragraph that highlights both positive and negative feedback (if any). "
         "Keep it brief but informative."
     )
+    return {"raw_text": review_blob, "instruction": instruction, "max_tokens": 200}
+
+def generate_summary(reviews: list[str]) -> str:
+    if not reviews:
+        return "No reviews."
+    return complete(**summary_request(reviews))
+
+
+# Pruning parity on real reviews: python -m services.review_service [rows]
+if __name__ == "__main__":
+    import sys
+    import json
+    import pandas as pd
+    from .inference_backend import PARITY_CSV
 
-    return generate_gpt_summary(review_blob, instruction=instruction, max_tokens=200)
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    texts = pd.read_csv(PARITY_CSV)["clean_review"].dropna().astype(str).tolist()[:rows]
+    report = check_pruning(texts)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["probs_identical"] and report["contribs_identical"] else 1)
@@ -6,11 +6,16 @@ from mongoengine import (
     FloatField,
     ListField,
     DictField,
+    IntField,
+    PointField,
 )
 import datetime
+import hashlib
 from datetime import timedelta
 import logging
 
+from config import Config
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,33 +43,94 @@ class CachedShop(Document):
     name = StringField(required=True)
     place_id = StringField(required=True, unique=True)
     rating = FloatField()
-    reviews = ListField(DictField())
     address = StringField()
     lat = FloatField()
     lng = FloatField()
+    location = PointField()                      # GeoJSON [lng, lat], 2dsphere indexed
+    products = ListField(StringField())          # normalized searches this shop matched
     cached_at = DateTimeField(default=datetime.datetime.utcnow)
     phone = StringField()                        
     opening_hours = DictField()                 
     weekday_text = ListField(StringField())     
-
-    meta = {'collection': 'cached_shops'}
+    hours_index = DictField()                    # compile_opening_hours(opening_hours)
+    # per-review ratings, newest review first (texts live in CachedReview)
+    review_ratings = ListField(FloatField())
+    summary = StringField()
+    xai_explanation = StringField()
+    model_version = StringField()
+
+    # strict=False: entries written before CachedReview still carry `reviews`
+    meta = {
+        'collection': 'cached_shops',
+        'indexes': ['products'],
+        'strict': False,
+    }
 
     def is_cache_valid(self):
         # Cache is valid for 7 days
         return (datetime.datetime.utcnow() - self.cached_at).days < 7
 
+    def has_predictions(self, model_version, review_count):
+        # Stored ratings are reusable only if made by the current model
+        return (
+            self.model_version == model_version
+            and len(self.review_ratings or []) >= review_count
+            and self.summary is not None
+            and self.xai_explanation is not None
+        )
+
     @classmethod
     def cleanup_invalid_cache(cls):
         expired = cls.objects(
             cached_at__lt=datetime.datetime.utcnow() - timedelta(days=7)
         )
         if expired:
+            CachedReview.objects(place_id__in=list(expired.scalar("place_id"))).delete()
             count = expired.delete()
             logger.info(f"Deleted {count} expired cached shops.")
         else:
             logger.info("No expired cached shops to delete.")
 
 
+class CachedReview(Document):
+    key = StringField()                          # review_key(place_id, author, text)
+    place_id = StringField(required=True)
+    author = StringField()
+    text = StringField(required=True)
+    date = DateTimeField()
+    rating = FloatField()
+    probs = ListField(FloatField())
+
+    meta = {
+        'collection': 'cached_reviews',
+        'indexes': [
+            ('place_id', '-date'),
+            # sparse: rows written before the key existed have none
+            {'fields': ['key'], 'unique': True, 'sparse': True},
+        ],
+    }
+
+    @staticmethod
+    def review_key(place_id, author, text):
+        return hashlib.sha256(f"{place_id}\x00{author}\x00{text}".encode()).hexdigest()
+
+    @classmethod
+    def top(cls, place_id, n=None):
+        # newest first, served straight from the (place_id, date desc) index
+        qs = cls.objects(place_id=place_id).order_by('-date')
+        return qs.limit(n) if n else qs
+
+    @classmethod
+    def documents_for_shop(cls, place_id, reviews, ratings, probs):
+        # raw documents, ready for a keyed bulk upsert
+        return [
+            cls(key=cls.review_key(place_id, r.get("author"), r["text"]),
+                place_id=place_id, author=r.get("author"), text=r["text"],
+                date=r.get("date"), rating=rt, probs=pr).to_mongo().to_dict()
+            for r, rt, pr in zip(reviews, ratings, probs)
+        ]
+
+
 class ZeroReviewShop(Document):
     place_id = StringField(required=True, unique=True)
     added_at = DateTimeField(default=datetime.datetime.utcnow)
@@ -85,3 +151,75 @@ class ZeroReviewShop(Document):
             logger.info(f"Deleted {count} expired zero review shops.")
         else:
             logger.info("No expired zero review shops to delete.")
+
+
+class PlaceDetails(Document):
+    place_id = StringField(required=True, unique=True)
+    opening_hours = DictField()
+    hours_index = DictField()
+    phone = StringField()
+    fetched_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    TTL = timedelta(days=3)
+
+    # Mongo drops entries itself once they pass the TTL
+    meta = {
+        'collection': 'place_details',
+        'indexes': [
+            {'fields': ['fetched_at'], 'expireAfterSeconds': int(TTL.total_seconds())}
+        ],
+    }
+
+    def as_google_result(self):
+        # Same shape as a Places "details" result
+        return {
+            "opening_hours": self.opening_hours or {},
+            "formatted_phone_number": self.phone or "N/A",
+            "hours_index": self.hours_index or None,
+        }
+
+
+class LLMResponse(Document):
+    # sha256 of model, instruction, input and max_tokens
+    key = StringField(required=True, unique=True)
+    text = StringField()
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    TTL = timedelta(days=30)
+
+    meta = {
+        'collection': 'llm_responses',
+        'indexes': [
+            {'fields': ['created_at'], 'expireAfterSeconds': int(TTL.total_seconds())}
+        ],
+    }
+
+
+class SearchJob(Document):
+    job_id = StringField(required=True, unique=True)
+    status = StringField(default="queued", choices=("queued", "running", "done", "failed"))
+    request = DictField()
+    result = StringField()                       # JSON-encoded shops, once done
+    error = DictField()                          # error payload, once failed
+    status_code = IntField()                     # HTTP status the search ended with
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+    started_at = DateTimeField()
+    finished_at = DateTimeField()
+
+    TTL = timedelta(seconds=Config.SEARCH_JOB_TTL_S)
+
+    meta = {
+        'collection': 'search_jobs',
+        'indexes': [
+            {'fields': ['created_at'], 'expireAfterSeconds': int(TTL.total_seconds())}
+        ],
+    }
+
+    def as_status(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
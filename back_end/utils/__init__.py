@@ -4,11 +4,16 @@ Utilities package for helper functions.
 __version__ = "1.0.0"
 
 
-from .helpers import convert_numpy_types , is_open_on
+from .helpers import convert_numpy_types , is_open_on , normalize_product
 from .extensions import cache
+from .write_buffer import WriteBuffer
+from .search_cache import geohash_encode, geohash_center, geohash_half_diagonal_m, radius_bucket
 from .verify import validate_signup_data, check_existing_user ,format_phone_number
-from .DB_models import User , ReviewSettings ,CachedShop , ZeroReviewShop
+from .DB_models import User , ReviewSettings ,CachedShop , CachedReview , ZeroReviewShop , PlaceDetails , LLMResponse , SearchJob
 from .brevo_email import send_email_via_brevo
-from .distanceCalculate import calculate_distance
+from .distanceCalculate import calculate_distance , calculate_distances
+from .async_loop import loop, run_async
+from .opening_hours import compile_opening_hours, is_open_at, filter_open
+from .nltk_data import ensure_nltk_data
 
-__all__ = ["convert_numpy_types" , "cache" , "validate_signup_data", "check_existing_user" , "User" , "format_phone_number" , "send_email_via_brevo","ReviewSettings" ,"CachedShop" , "ZeroReviewShop" , "calculate_distance" ,"is_open_on"]
+__all__ = ["convert_numpy_types" , "cache" , "validate_signup_data", "check_existing_user" , "User" , "format_phone_number" , "send_email_via_brevo","ReviewSettings" ,"CachedShop" , "CachedReview" , "ZeroReviewShop" , "PlaceDetails" , "LLMResponse" , "SearchJob" , "calculate_distance" ,"is_open_on" , "loop" , "run_async" , "compile_opening_hours" , "is_open_at" , "filter_open" , "normalize_product" , "calculate_distances" , "geohash_encode" , "geohash_center" , "geohash_half_diagonal_m" , "radius_bucket" , "WriteBuffer" , "ensure_nltk_data"]
@@ -0,0 +1,14 @@
+import asyncio
+import threading
+import nest_asyncio
+
+# Background event loop shared by the scraper, browser pool and async HTTP clients
+nest_asyncio.apply()
+loop = asyncio.new_event_loop()
+asyncio.set_event_loop(loop)
+threading.Thread(target=lambda: loop.run_forever(), daemon=True).start()
+
+
+def run_async(coro, timeout=None):
+    """Run a coroutine on the background loop from a worker thread and wait for it."""
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=timeout)
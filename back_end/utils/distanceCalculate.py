@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 def calculate_distance(lat1, lon1, lat2, lon2):
 
@@ -20,3 +21,14 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     # Calculate distance in kilometers
     distance = R * c
     return distance
+
+
+def calculate_distances(lat, lon, lats, lons):
+    # Vectorized haversine from one point to many, in kilometers
+    R = 6371.0
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=np.float64)) - np.radians(lon)
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
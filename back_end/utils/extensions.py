@@ -1,3 +1,10 @@
 from flask_caching import Cache
+from config import Config
 
-cache = Cache(config={'CACHE_TYPE': 'simple'})
+# Search results shared by all workers (see utils.search_cache)
+cache = Cache(config={
+    'CACHE_TYPE': 'utils.search_cache.SqliteLRUCache',
+    'CACHE_DIR': Config.SEARCH_CACHE_DIR,
+    'CACHE_THRESHOLD': Config.SEARCH_CACHE_MAX_ENTRIES,
+    'CACHE_DEFAULT_TIMEOUT': 300,
+})
@@ -1,6 +1,7 @@
 import numpy as np
 from datetime import time as _time
 import datetime
+from .opening_hours import compile_opening_hours, is_open_at
 
 
 def convert_numpy_types(data):
@@ -15,29 +16,9 @@ def convert_numpy_types(data):
     else:
         return data
     
-def is_open_on(opening_hours: dict, target_date: datetime.date, target_time: _time=None) -> bool:
-
-    periods = opening_hours.get("periods", [])
-    gwday = (target_date.weekday() + 1) % 7
-
-    for p in periods:
-        if p["open"]["day"] != gwday:
-            continue
-
-        if not target_time:
-            return True
+def normalize_product(product_name: str) -> str:
+    # Key used to remember which searches a cached shop matched
+    return " ".join(product_name.lower().split())
 
-        ot, ct = p["open"]["time"], p["close"]["time"]
-        open_t = _time(int(ot[:2]), int(ot[2:]))
-        close_t = _time(int(ct[:2]), int(ct[2:]))
-
-        # normal span
-        if open_t <= close_t:
-            if open_t <= target_time <= close_t:
-                return True
-        else:
-            # overnight span
-            if target_time >= open_t or target_time <= close_t:
-                return True
-
-    return False
\ No newline at end of file
+def is_open_on(opening_hours: dict, target_date: datetime.date, target_time: _time=None) -> bool:
+    return is_open_at(compile_opening_hours(opening_hours), target_date, target_time)
@@ -0,0 +1,53 @@
+import os
+import logging
+
+import nltk
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# package name → path nltk.data.find() looks it up under
+RESOURCES = {
+    "punkt": "tokenizers/punkt",
+    "averaged_perceptron_tagger": "taggers/averaged_perceptron_tagger",
+    "vader_lexicon": "sentiment/vader_lexicon.zip",
+    "stopwords": "corpora/stopwords",
+    "wordnet": "corpora/wordnet",
+    "omw-1.4": "corpora/omw-1.4",
+}
+
+if Config.NLTK_DATA_DIR not in nltk.data.path:
+    nltk.data.path.insert(0, Config.NLTK_DATA_DIR)
+
+
+def ensure_nltk_data(*packages):
+    """
+    Make sure the NLTK packages are available, looking in NLTK_DATA_DIR first.
+    Missing ones are downloaded there only if NLTK_ALLOW_DOWNLOAD is set,
+    otherwise a LookupError names them.
+    """
+    missing = []
+    for pkg in packages:
+        try:
+            nltk.data.find(RESOURCES[pkg])
+        except LookupError:
+            missing.append(pkg)
+    if not missing:
+        return
+
+    if not Config.NLTK_ALLOW_DOWNLOAD:
+        raise LookupError(
+            f"NLTK data missing from {Config.NLTK_DATA_DIR}: {', '.join(missing)} "
+            "(run `python -m utils.nltk_data` to build the bundle)"
+        )
+    for pkg in missing:
+        logger.info(f"Downloading NLTK package '{pkg}' into {Config.NLTK_DATA_DIR}")
+        nltk.download(pkg, download_dir=Config.NLTK_DATA_DIR, quiet=True)
+
+
+# Build the local bundle (e.g. at image build time): python -m utils.nltk_data
+if __name__ == "__main__":
+    os.makedirs(Config.NLTK_DATA_DIR, exist_ok=True)
+    for pkg in RESOURCES:
+        nltk.download(pkg, download_dir=Config.NLTK_DATA_DIR)
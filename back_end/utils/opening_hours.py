@@ -0,0 +1,80 @@
+import datetime
+from bisect import bisect_right
+from datetime import time as _time
+import numpy as np
+
+DAY = 24 * 60 * 60
+ALL_DAYS = 0b1111111
+
+# Compiled weekly hours:
+#   {"days": bitmask of Google weekdays (0 = Sunday) with an opening,
+#    "starts": [...], "ends": [...]}
+# starts/ends are inclusive, sorted, merged seconds-of-week intervals. Each period is
+# matched against the calendar day it opens on, exactly like the raw
+# `periods` walk: an overnight 22:00-02:00 opening on Friday covers Friday
+# 22:00-23:59:59 and Friday 00:00-02:00.
+
+
+def _seconds(hhmm: str) -> int:
+    return int(hhmm[:2]) * 3600 + int(hhmm[2:]) * 60
+
+
+def compile_opening_hours(opening_hours: dict) -> dict:
+    days = 0
+    spans = []
+    for p in (opening_hours or {}).get("periods", []):
+        if "close" not in p:
+            # Google's 24/7 marker: a single open period with no close
+            return {"days": ALL_DAYS, "starts": [0], "ends": [7 * DAY - 1]}
+
+        d = p["open"]["day"]
+        base = d * DAY
+        days |= 1 << d
+        o, c = _seconds(p["open"]["time"]), _seconds(p["close"]["time"])
+        if o <= c:
+            spans.append((base + o, base + c))
+        else:
+            # overnight span
+            spans.append((base + o, base + DAY - 1))
+            spans.append((base, base + c))
+
+    merged = []
+    for s, e in sorted(spans):
+        if merged and s <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return {"days": days, "starts": [s for s, _ in merged], "ends": [e for _, e in merged]}
+
+
+def _week_second(target_date: datetime.date, target_time: _time):
+    gwday = (target_date.weekday() + 1) % 7
+    return gwday, gwday * DAY + target_time.hour * 3600 + target_time.minute * 60 + target_time.second
+
+
+def is_open_at(compiled: dict, target_date: datetime.date, target_time: _time = None) -> bool:
+    gwday, s = _week_second(target_date, target_time or _time())
+    if not target_time:
+        return bool(compiled["days"] >> gwday & 1)
+
+    i = bisect_right(compiled["starts"], s) - 1
+    return i >= 0 and s <= compiled["ends"][i]
+
+
+def filter_open(compiled_list: list, target_date: datetime.date, target_time: _time = None) -> np.ndarray:
+    """Boolean mask over compiled_list: which places are open at date/time."""
+    gwday, s = _week_second(target_date, target_time or _time())
+    if not target_time:
+        days = np.array([c["days"] for c in compiled_list], dtype=np.int64)
+        return (days >> gwday & 1).astype(bool)
+
+    empty = [np.zeros(0, dtype=np.int64)]
+    owners = np.concatenate([
+        np.full(len(c["starts"]), n, dtype=np.int64) for n, c in enumerate(compiled_list)
+    ] or empty)
+    starts = np.concatenate([np.asarray(c["starts"], dtype=np.int64) for c in compiled_list] or empty)
+    ends = np.concatenate([np.asarray(c["ends"], dtype=np.int64) for c in compiled_list] or empty)
+
+    mask = np.zeros(len(compiled_list), dtype=bool)
+    mask[owners[(starts <= s) & (s <= ends)]] = True
+    return mask
@@ -0,0 +1,165 @@
+import os
+import math
+import time
+import pickle
+import sqlite3
+import threading
+
+from flask_caching.backends.base import BaseCache
+
+from .distanceCalculate import calculate_distance
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+#  Geohash tiles
+def geohash_encode(lat: float, lng: float, precision: int) -> str:
+    lat_rng, lng_rng = [-90.0, 90.0], [-180.0, 180.0]
+    out, bits, ch, even = [], 0, 0, True
+    while len(out) < precision:
+        rng, val = (lng_rng, lng) if even else (lat_rng, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if val >= mid:
+            ch = (ch << 1) | 1
+            rng[0] = mid
+        else:
+            ch <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def geohash_bounds(gh: str) -> tuple[list, list]:
+    lat_rng, lng_rng = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for c in gh:
+        cd = _BASE32.index(c)
+        for shift in range(4, -1, -1):
+            rng = lng_rng if even else lat_rng
+            mid = (rng[0] + rng[1]) / 2
+            if cd >> shift & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_rng, lng_rng
+
+
+def geohash_center(gh: str) -> tuple[float, float]:
+    lat_rng, lng_rng = geohash_bounds(gh)
+    return (lat_rng[0] + lat_rng[1]) / 2, (lng_rng[0] + lng_rng[1]) / 2
+
+
+def geohash_half_diagonal_m(gh: str) -> float:
+    # farthest a point in the tile can be from its centre
+    lat_rng, lng_rng = geohash_bounds(gh)
+    lat, lng = geohash_center(gh)
+    return max(calculate_distance(lat, lng, la, ln) for la in lat_rng for ln in lng_rng) * 1000
+
+
+def radius_bucket(radius_m: int, step_m: int) -> int:
+    return int(math.ceil(radius_m / step_m) * step_m)
+
+
+#  Shared LRU backend
+class SqliteLRUCache(BaseCache):
+    """
+    Flask-Caching backend kept in one SQLite file, so every worker process
+    shares the same entries. Holds at most `threshold` entries, evicting the
+    least recently read first, and counts hits and misses.
+    """
+
+    def __init__(self, path, threshold=500, default_timeout=300):
+        super().__init__(default_timeout)
+        self.path = path
+        self.threshold = threshold
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS entries ("
+                       "key TEXT PRIMARY KEY, value BLOB, expires REAL, accessed REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, count INTEGER)")
+            db.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(threshold=config["CACHE_THRESHOLD"])
+        path = os.path.join(config["CACHE_DIR"], "search_cache.sqlite3")
+        return cls(path, *args, **kwargs)
+
+    def _conn(self):
+        # one connection per thread; WAL lets readers and a writer overlap
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            self._local.db = db
+        return db
+
+    def _count(self, db, name):
+        db.execute("UPDATE stats SET count = count + 1 WHERE name = ?", (name,))
+
+    def get(self, key):
+        now = time.time()
+        with self._conn() as db:
+            row = db.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] and row[1] <= now):
+                self._count(db, "misses")
+                return None
+            db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self._count(db, "hits")
+        return pickle.loads(row[0])
+
+    def has(self, key):
+        row = self._conn().execute("SELECT expires FROM entries WHERE key = ?", (key,)).fetchone()
+        return row is not None and not (row[0] and row[0] <= time.time())
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        now = time.time()
+        expires = now + timeout if timeout else 0
+        with self._conn() as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                       (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires, now))
+            self._prune(db, now)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def _prune(self, db, now):
+        db.execute("DELETE FROM entries WHERE expires > 0 AND expires <= ?", (now,))
+        (count,) = db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.threshold:
+            db.execute("DELETE FROM entries WHERE key IN "
+                       "(SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+                       (count - self.threshold,))
+
+    def delete(self, key):
+        with self._conn() as db:
+            return db.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0
+
+    def clear(self):
+        with self._conn() as db:
+            db.execute("DELETE FROM entries")
+        return True
+
+    def stats(self):
+        db = self._conn()
+        counts = dict(db.execute("SELECT name, count FROM stats").fetchall())
+        (entries,) = db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_rate": round(counts["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.threshold,
+        }
@@ -0,0 +1,60 @@
+import logging
+import threading
+from collections import defaultdict
+
+from pymongo import UpdateOne, DeleteMany
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBuffer:
+    """
+    Collects one request's Mongo writes and sends a single bulk_write per
+    collection on flush(). Collections that mix deletes with upserts are
+    written in order; everything else goes unordered. Writes added after
+    flush() (candidates still finishing once the search is done) are sent
+    straight away instead of waiting for a flush that never comes.
+    """
+
+    def __init__(self):
+        self._ops = defaultdict(list)
+        self._lock = threading.Lock()
+        self._flushed = False
+
+    def _add(self, model, *ops):
+        with self._lock:
+            if not self._flushed:
+                self._ops[model].extend(ops)
+                return
+        self._write(model, list(ops))
+
+    def upsert(self, model, filter_, update):
+        self._add(model, UpdateOne(filter_, update, upsert=True))
+
+    def update(self, model, filter_, update):
+        self._add(model, UpdateOne(filter_, update))
+
+    def replace_many(self, model, filter_, documents, key="key"):
+        # upsert by a deterministic key, then drop the rows not in this set:
+        # concurrent replacements of the same set can't leave duplicates
+        keys = [d[key] for d in documents]
+        self._add(
+            model,
+            *(UpdateOne({key: d[key]}, {"$set": d}, upsert=True) for d in documents),
+            DeleteMany({**filter_, key: {"$nin": keys}}),
+        )
+
+    def flush(self):
+        with self._lock:
+            pending, self._ops = self._ops, defaultdict(list)
+            self._flushed = True
+        for model, ops in pending.items():
+            self._write(model, ops)
+
+    @staticmethod
+    def _write(model, ops):
+        ordered = any(isinstance(op, DeleteMany) for op in ops)
+        try:
+            model._get_collection().bulk_write(ops, ordered=ordered)
+        except Exception:
+            logger.exception(f"Bulk write to {model.__name__} failed")